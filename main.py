@@ -1,15 +1,161 @@
-from pandas import DataFrame
-from typing import Union
-import logging, os, shutil
-from colorama import Fore
+from __future__ import annotations
+from typing import Union, TYPE_CHECKING
+import logging, os, shutil, sys, importlib, time, hashlib, threading, mmap, functools, errno, datetime, decimal
+from collections import OrderedDict
+from itertools import islice
 import random
-from prettytable import PrettyTable
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
 
 severity_level = logging.DEBUG
 logger = logging.getLogger(__name__)
 FORMAT = "[%(filename)s:%(lineno)s - %(funcName)20s() ] %(message)s"
-logging.basicConfig(format=FORMAT)
-logger.setLevel(severity_level)
+
+# ----------------------------------------
+# Lazy imports
+
+class LazyImport():
+    """Stands in for a module, or for an attribute of a module, and only imports it on first attribute access."""
+
+    def __init__(self, module:str, attribute:str = None) -> None:
+        self.module = module
+        self.attribute = attribute
+        self.target = None
+
+    def load(self):
+        """Imports the module (if needed) and returns the object this instance stands in for."""
+        if self.target is None:
+            target = importlib.import_module(self.module)
+            if self.attribute is not None:
+                target = getattr(target, self.attribute)
+            self.target = target
+        return self.target
+
+    def __getattr__(self, name:str):
+        return getattr(self.load(), name)
+
+np = LazyImport("numpy")
+pd = LazyImport("pandas")
+prettytable = LazyImport("prettytable")
+Fore = LazyImport("colorama", "Fore")
+
+class Colored():
+    """Text that is only wrapped in a ``colorama.Fore`` color when it is formatted. Passed as a lazy logging
+    argument, so log calls below the logger level never import colorama or build the colored string."""
+
+    def __init__(self, text, color:str) -> None:
+        self.text = text
+        self.color = color
+
+    def __str__(self) -> str:
+        return getattr(Fore, self.color) + str(self.text) + Fore.RESET
+
+# ----------------------------------------
+# Instrumentation
+
+class Instrumentation():
+    """Opt-in latency and counter instrumentation of the public operations. Enabled by setting the
+    ``UTILITY_PACK_INSTRUMENTATION`` environment variable to 1 or by calling ``enable()``. While disabled,
+    an instrumented call only costs one attribute check."""
+
+    def __init__(self) -> None:
+        self.enabled = os.environ.get("UTILITY_PACK_INSTRUMENTATION", "0") not in ("", "0")
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.profiler = None
+        self.operations = {}
+
+    def enable(self, profile:bool = False) -> None:
+        """Starts recording. If `profile` is True, instrumented calls also run under a ``cProfile.Profile``."""
+        if profile and self.profiler is None:
+            import cProfile
+            self.profiler = cProfile.Profile()
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stops recording. Recorded data is kept until ``reset()``."""
+        self.enabled = False
+
+    def reset(self) -> None:
+        """Drops every recorded operation and the profiler."""
+        with self.lock:
+            self.operations = {}
+            self.profiler = None
+
+    def operation(self, name:str) -> dict:
+        """Returns the record of operation `name`, creating it if needed. Caller must hold the lock."""
+        record = self.operations.get(name)
+        if record is None:
+            record = {"calls": 0, "total_seconds": 0.0, "max_seconds": 0.0, "histogram": {}, "counts": {}}
+            self.operations[name] = record
+        return record
+
+    def record(self, name:str, seconds:float) -> None:
+        """Records one call of `name` that took `seconds`. Latencies are bucketed by powers of two microseconds."""
+        bucket = f"<={1 << int(seconds * 1e6).bit_length()}us"
+        with self.lock:
+            record = self.operation(name)
+            record["calls"] += 1
+            record["total_seconds"] += seconds
+            record["max_seconds"] = max(record["max_seconds"], seconds)
+            record["histogram"][bucket] = record["histogram"].get(bucket, 0) + 1
+
+    def add(self, name:str, **counts) -> None:
+        """Adds item counts (rows, labels, files, bytes...) to operation `name`."""
+        with self.lock:
+            record_counts = self.operation(name)["counts"]
+            for key, value in counts.items():
+                record_counts[key] = record_counts.get(key, 0) + value
+
+    def snapshot(self) -> dict:
+        """Returns a copy of every recorded operation, with the mean latency added."""
+        with self.lock:
+            operations = {}
+            for name, record in self.operations.items():
+                operations[name] = dict(record, histogram = dict(record["histogram"]), counts = dict(record["counts"]),
+                                        mean_seconds = record["total_seconds"] / record["calls"] if record["calls"] else 0.0)
+        return {"enabled": self.enabled, "operations": operations}
+
+    def profile_stats(self):
+        """Returns a ``pstats.Stats`` of the profiled calls, or None if profiling was not enabled."""
+        if self.profiler is None:
+            return None
+        import pstats
+        return pstats.Stats(self.profiler)
+
+    def call(self, name:str, function, args, kwargs):
+        """Runs function, recording its latency and, if profiling, profiling the outermost instrumented call."""
+        profiler = self.profiler
+        depth = getattr(self.local, "depth", 0)
+        self.local.depth = depth + 1
+        if profiler is not None and depth == 0:
+            profiler.enable()
+
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            if profiler is not None and depth == 0:
+                profiler.disable()
+            self.local.depth = depth
+            self.record(name, seconds)
+
+instrumentation = Instrumentation()
+
+def instrumented(name:str):
+    """Decorator that records the calls of the decorated function as operation `name` while ``instrumentation`` is enabled."""
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not instrumentation.enabled:
+                return function(*args, **kwargs)
+            return instrumentation.call(name, function, args, kwargs)
+        return wrapper
+
+    return decorator
 
 # ----------------------------------------
 # Exceptions
@@ -24,19 +170,41 @@ class NotDirectoryException(Exception):
 # ----------------------------------------
 # Classes
 
-class ResultPrinter(PrettyTable):
+class ResultPrinter():
+    """Prints a table with the names and values of the variables in args. Every positional argument is either a
+    ``(name, value)`` pair or the name of a variable of the caller (dotted attribute names are allowed), and every
+    keyword argument is a name and its value. Values wider than ``max_width`` characters are truncated.
+
+    Wraps a ``prettytable.PrettyTable``, which is only imported when a ResultPrinter is created. Large result sets
+    should be streamed with ``print_rows()`` instead."""
+
+    max_width = 80
 
     def __init__(self, *args, **kwargs):
-        super().__init__()
+        self.table = prettytable.PrettyTable()
+
+        self.table.field_names = ["var name", "value"]
 
-        self.field_names = ["var name", "value"]
+        caller = sys._getframe(1)
+        try:
+            for var in args:
+                name, value = (var, caller_variable(var, caller)) if isinstance(var, str) else var
+                self.table.add_row([name, cell_text(value, self.max_width)])
+        finally:
+            del caller
 
-        for var in args:
-            row = [var,eval(var)]
-            self.add_row(row)
+        for name, value in kwargs.items():
+            self.table.add_row([name, cell_text(value, self.max_width)])
 
         print(self)
-        
+
+    def __str__(self) -> str:
+        return str(self.table)
+
+    def __getattr__(self, name:str):
+        if name == "table": raise AttributeError(name)
+        return getattr(self.table, name)
+
 class CaseCorrection():
 
     def __init__(self,
@@ -48,43 +216,86 @@ class CaseCorrection():
             - `reference`: reference for correction
         """
 
-        logger.debug(f'Instantiating object')
+        logger.debug('Instantiating object')
         self._object = _object
         self.tuple_or_string_to_list()
 
     def __str__(self) -> str:
         return self.object_report()
 
-    def correct(self, reference:Union[tuple,list,DataFrame]) -> Union[DataFrame,list]:
-        """Applies case corrections according to reference parameter"""
+    @instrumented("correct")
+    def correct(self, reference:Union[tuple,list,DataFrame], use_cache:bool = True, inplace:bool = True) -> Union[DataFrame,list]:
+        """Applies case corrections according to reference parameter. If `use_cache` is True, mappers are reused
+        from the module ``mapper_cache`` whenever the same labels are corrected against the same reference.
+        DataFrames are relabeled in place unless `inplace` is False (see ``dataframe_case_correct()``)."""
 
         # checking if reference is a dataframe and converting to list if needed
-        logger.debug(f'Old reference object {reference}')
+        logger.debug('Old reference object %s', reference)
         reference = correction_labels_to_list(reference)
-        logger.debug(f'New reference object {reference}')
+        logger.debug('New reference object %s', reference)
 
         # creating mapper dict for conversion
-        logger.debug(f'Creating mapper based on reference')
-        mapper = self.create_mapper(reference)
-        logger.debug(f'Created mapper: {mapper}')
+        logger.debug('Creating mapper based on reference')
+        mapper = self.create_mapper(reference, cache = mapper_cache if use_cache else None)
+        logger.debug('Created mapper: %s', mapper)
 
         # applying correction
-        self.correction_handler()
+        self.correction_handler(inplace = inplace)
+
+        if instrumentation.enabled:
+            instrumentation.add("correct", labels = len(self.dataframe_check()), renamed = len(mapper))
 
         return self.corrected_object
 
-    def correction_handler(self):
-        """Calls the adequate correction method according to _object type."""
+    @classmethod
+    def correct_many(cls, objects, reference:Union[tuple,list,DataFrame,ReferenceIndex], workers:int = None, inplace:bool = True) -> tuple:
+        """Corrects every object in `objects` (strings, lists, tuples or DataFrames) against the same reference.
+
+        The reference is compiled into a ``ReferenceIndex`` only once and shared by every correction. If `workers`
+        is given, objects are corrected in a thread pool of that size. `inplace` works as in ``correct()``.
+
+        Returns a ``(corrected_objects, stats)`` tuple. Both lists follow the order of `objects`; every stats dict
+        holds the number of labels of the object, the number of labels renamed and the mapper used."""
+
+        index = reference if type(reference) == ReferenceIndex else ReferenceIndex(reference)
+
+        def correct_one(_object):
+            correction = cls(_object)
+            labels = correction.dataframe_check()
+            mapper = correction.create_mapper(index)
+            correction.correction_handler(inplace = inplace)
+
+            stats = {"labels": len(labels),
+                     "renamed": sum(1 for label in labels if label in mapper),
+                     "mapper": mapper}
+            return correction.corrected_object, stats
+
+        if workers:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers = workers) as pool:
+                results = list(pool.map(correct_one, objects))
+        else:
+            results = [correct_one(_object) for _object in objects]
+
+        corrected_objects = [result[0] for result in results]
+        stats = [result[1] for result in results]
+        logger.info("%s objects corrected, %s labels renamed", len(results), sum(stat["renamed"] for stat in stats))
+
+        return corrected_objects, stats
+
+    def correction_handler(self, inplace:bool = True):
+        """Calls the adequate correction method according to _object type. `inplace` is passed on to ``dataframe_case_correct()``."""
 
         if type(self._object) == list:
             self.list_case_correct()
-        elif type(self._object) == DataFrame:
-            self.dataframe_case_correct()
+        elif is_dataframe(self._object):
+            self.dataframe_case_correct(inplace = inplace)
         else:
             self.corrected_object = None
 
-    def object_report(self) -> str:
-        """Provides insights on the objects attributes"""
+    def object_report(self, sample_size:int = None) -> str:
+        """Provides insights on the objects attributes. If `sample_size` is given, statistics computed by
+        ``object_statistics()`` on a sample of that size are added to the report."""
 
         report_list = []
 
@@ -93,7 +304,7 @@ class CaseCorrection():
 
 
         try: length_report = f"Length: {len(self._object)}"
-        except: length_report = 'Does not apply'
+        except TypeError: length_report = 'Does not apply'
         report_list.append(length_report)
 
         try:
@@ -106,26 +317,29 @@ class CaseCorrection():
                 if len(content_list) > 5: break
 
             content_report = "Content: " + ', '.join(content_list)
-        except: content_report = 'Content: Does not apply'
+        except TypeError: content_report = 'Content: Does not apply'
 
         report_list.append(content_report)
 
+        if sample_size is not None:
+            report_list.append(f"Statistics: {object_statistics(self._object, sample_size = sample_size)}")
+
         report = '\n'.join(report_list)
 
         return report
 
     def tuple_or_string_to_list(self) -> None:
         """If _object is a tuple, turns it into a list. Else, creates a list with x as it's only object. """
-        logger.debug(f'Checking object type')
+        logger.debug('Checking object type')
         if type(self._object) == tuple:
-            logger.debug(f'Object is a tuple. Converting tuple {self._object} into list')
+            logger.debug('Object is a tuple. Converting tuple %s into list', self._object)
             self._object = list(self._object)
-            logger.debug(f'Tuple converted into list: {self._object}')
+            logger.debug('Tuple converted into list: %s', self._object)
         elif type(self._object) == str:
-            logger.debug(f'Object is a string. Converting single string {self._object} into list')
+            logger.debug('Object is a string. Converting single string %s into list', self._object)
             self._object = [self._object]
-            logger.debug(f'String converted into list {self._object}')
-        logger.debug(f'Object is a {type(self._object)}. No conversion done. Object value is {self._object}')
+            logger.debug('String converted into list %s', self._object)
+        logger.debug('Object is a %s. No conversion done. Object value is %s', type(self._object), self._object)
 
     def unify_list(self, nested_list):
         """
@@ -159,10 +373,10 @@ class CaseCorrection():
             string_list with all strings converted to only lower case.
         """
 
-        logger.debug(f"checking and creating lower case strings list")
-        logger.debug(f"Original string list: {self._object}")
+        logger.debug("checking and creating lower case strings list")
+        logger.debug("Original string list: %s", self._object)
         strings_lower = [string.lower() for string in self._object]
-        logger.debug(f"lower case string list: {strings_lower}")
+        logger.debug("lower case string list: %s", strings_lower)
 
         return strings_lower
 
@@ -177,30 +391,32 @@ class CaseCorrection():
     def dataframe_check(self) -> list:
         """returns list with column labels if self._object is a DataFrame. Otherwise, returns self._object unaltered."""
 
-        logger.debug(f'Checking if object is a DataFrame.')
-        if type(self._object) == DataFrame:
+        logger.debug('Checking if object is a DataFrame.')
+        if is_dataframe(self._object):
             list_of_labels = list(self._object.columns)
-            logger.debug(f'DataFrame detected. Returnling list of labels: {list_of_labels}')
+            logger.debug('DataFrame detected. Returnling list of labels: %s', list_of_labels)
             return list_of_labels
 
-        logger.debug(f'Not a DataFrame. Returning object unaltered: {self._object}')
+        logger.debug('Not a DataFrame. Returning object unaltered: %s', self._object)
         return self._object
 
-    def create_mapper(self, reference) -> dict:
-        """Creates a mapper object for correction of strings list. Mapper keys are strings to be corrected in original list and mapper values are the corrected version of the string."""
+    def create_mapper(self, reference, cache:MapperCache = None) -> dict:
+        """Creates a mapper object for correction of strings list. Mapper keys are strings to be corrected in original list and mapper values are the corrected version of the string.
+
+        `reference` may be a list of labels or an already compiled ``ReferenceIndex``. If a `cache` is given, a list
+        reference is looked up in it before a new mapper is built."""
 
-        logger.debug(f'Creating mapper object')
-        case_correction_mapper = {}
+        logger.debug('Creating mapper object')
 
         _object = self.dataframe_check()
 
-        for key in _object:
-            for value in reference:
-                logger.debug(f'Comparing list component {key} with reference list component {value}')
-                if self.case_insensitive_string_check(key,value) and key != value:
-                    logger.debug(f'Adding {key}:{value} to mapper')
-                    case_correction_mapper[key] = value
-        logger.debug(f'Mapper created: {case_correction_mapper}')
+        if cache is not None and type(reference) != ReferenceIndex:
+            case_correction_mapper = cache.mapper(_object, reference)
+        else:
+            if type(reference) != ReferenceIndex:
+                reference = ReferenceIndex(reference)
+            case_correction_mapper = reference.create_mapper(_object)
+        logger.debug('Mapper created: %s', case_correction_mapper)
 
         self.mapper = case_correction_mapper
 
@@ -225,33 +441,186 @@ class CaseCorrection():
 
         self.corrected_object = new_list
 
-    def dataframe_case_correct(self) -> None:
+    def dataframe_case_correct(self, inplace:bool = True) -> None:
         """
         Checks if any of the column labels are equal to any of the column names in the DataFrame, except for lowercase/uppercase inconsistencies.
         Corrects any of those inconsistencies.
 
+        The corrected labels are swapped in as a new column index, so the data blocks are never touched or copied.
+        Only plain object or string column indexes are swapped; any other index type (categorical, MultiIndex...) is
+        relabeled with ``DataFrame.rename()``.
+
         Arguments:
-        df: DataFrame that will have it's columns checked.
-        args: strings or nested lists|tuples of strings that will be used as reference to correct the DataFrame labels.
+        inplace: if True, the columns of the original DataFrame are replaced. If False, the original DataFrame is left
+        unchanged and the corrected object is a shallow copy sharing its data.
 
         Returns corrected DataFrame
         """
         df = self._object
-        logger.debug(f'df being used: {df}')
 
-        if type(df) != DataFrame:
-            logger.error(f'Object is not of DataFrame type. Could not apply corrections')
+        if not is_dataframe(df):
+            logger.error('Object is not of DataFrame type. Could not apply corrections')
             return None
 
-        logger.debug(f'Renaming DataFrame columns')
-        logger.debug(f'Old column names: {df.columns}')
-        df.rename(columns = self.mapper, inplace = True)
-        logger.debug(f'New column names: {df.columns}')
+        logger.debug('df being used: %s rows x %s columns', df.shape[0], df.shape[1])
+
+        if not inplace:
+            df = df.copy(deep = False)
+
+        columns = df.columns
+        plain = type(columns) == pd.Index and (columns.dtype == object or isinstance(columns.dtype, pd.StringDtype))
+        if self.mapper and not plain:
+            # categorical, multi and other special indexes keep their own relabeling rules
+            logger.debug('Renaming %s columns', type(columns).__name__)
+            df.rename(columns = self.mapper, inplace = True)
+        elif self.mapper:
+            logger.debug('Swapping column index, %s labels renamed', len(self.mapper))
+            mapper = self.mapper
+            labels = [mapper.get(label, label) for label in columns.tolist()]
+            df.columns = pd.Index(labels, dtype = columns.dtype, name = columns.name)
 
         self.corrected_object = df
 
+class ReferenceIndex():
+    """Case insensitive lookup table for a reference of labels. Every reference entry is lowered only once, so
+    building a mapper for n labels against m references costs O(n+m) instead of O(n*m)."""
+
+    def __init__(self, reference:Union[tuple,list,DataFrame]) -> None:
+        """
+        Arguments:
+            - `reference`: tuple, list or DataFrame (its column labels are used) with the correct spellings.
+        """
+
+        reference = correction_labels_to_list(reference)
+
+        index = {}
+        for label in reference:
+            if type(label) != str: continue
+            index.setdefault(label.lower(), []).append(label)
+        self.index = index
+
+        # lowered labels that have more than one spelling in the reference
+        self.ambiguous = {key: spellings for key, spellings in index.items() if len(set(spellings)) > 1}
+        self.warn_ambiguous(self.ambiguous)
+
+    @staticmethod
+    def warn_ambiguous(ambiguous:dict) -> None:
+        """Logs the ambiguous reference labels, if there are any."""
+        if ambiguous:
+            logger.warning('%s ambiguous reference labels found. The last spelling in the reference is used for each of them.', len(ambiguous))
+            logger.debug('Ambiguous reference labels: %s', ambiguous)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def lookup(self, label:str) -> Union[str,None]:
+        """Returns the reference spelling of `label`, or None if `label` is not in the reference or is already spelled correctly."""
+
+        if type(label) != str: return None
+
+        spellings = self.index.get(label.lower())
+        if spellings is None: return None
+
+        # the last spelling that differs from label wins, like the old pairwise comparison did
+        for spelling in reversed(spellings):
+            if spelling != label:
+                return spelling
+        return None
+
+    def create_mapper(self, labels) -> dict:
+        """Creates a mapper dict for the `labels` iterable. Keys are labels to be corrected and values are the reference spellings."""
+
+        mapper = {}
+        for label in labels:
+            spelling = self.lookup(label)
+            if spelling is not None:
+                mapper[label] = spelling
+
+        return mapper
+
+class MapperCache():
+    """Bounded LRU cache of case correction mappers. Keys are fingerprints of the labels being corrected and of
+    the reference, so objects with the same columns corrected against the same catalogue share one mapper.
+    The ambiguous labels of the reference are kept with every mapper and logged again on every hit."""
+
+    def __init__(self, maxsize:int = 128) -> None:
+        self.maxsize = maxsize
+        self.mappers = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.mappers)
+
+    def fingerprint(self, labels, reference) -> bytes:
+        """Returns a digest of the labels and of the reference, both in order."""
+        key = repr((list(labels), list(reference))).encode()
+        return hashlib.blake2b(key, digest_size = 16).digest()
+
+    def mapper(self, labels, reference) -> dict:
+        """Returns the mapper for `labels` against `reference`, building it with a ``ReferenceIndex`` on a miss.
+        A copy is returned, so callers may change it without affecting the cache."""
+
+        key = self.fingerprint(labels, reference)
+
+        with self.lock:
+            entry = self.mappers.get(key)
+            if entry is not None:
+                self.mappers.move_to_end(key)
+                self.hits += 1
+        if entry is not None:
+            mapper, ambiguous = entry
+            ReferenceIndex.warn_ambiguous(ambiguous)
+            return dict(mapper)
+
+        with self.lock:
+            self.misses += 1
+
+        index = ReferenceIndex(reference)
+        mapper = index.create_mapper(labels)
+
+        with self.lock:
+            self.mappers[key] = (mapper, index.ambiguous)
+            self.mappers.move_to_end(key)
+            self.evict()
+
+        return dict(mapper)
+
+    def evict(self) -> None:
+        """Drops the least recently used mappers until the cache fits maxsize. Caller must hold the lock."""
+        while len(self.mappers) > max(self.maxsize, 0):
+            self.mappers.popitem(last = False)
+            self.evictions += 1
+
+    def resize(self, maxsize:int) -> None:
+        """Changes the size limit, evicting mappers if needed."""
+        with self.lock:
+            self.maxsize = maxsize
+            self.evict()
+
+    def clear(self) -> None:
+        """Drops every mapper and resets the counters."""
+        with self.lock:
+            self.mappers.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> dict:
+        """Returns the hit, miss and eviction counters with the current and maximum size."""
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "size": len(self.mappers), "maxsize": self.maxsize}
+
+mapper_cache = MapperCache()
+
 class DataFormatting():
 
+    # PRAGMAs applied by ``to_sqlite()`` unless others are given
+    # journal_mode is left out on purpose: it is stored in the database file and would outlive the load
+    sqlite_pragmas = {"synchronous": "NORMAL", "temp_store": "MEMORY", "cache_size": -65536}
+
     def __init__(self, data) -> None:
         self.data = data
 
@@ -262,7 +631,7 @@ class DataFormatting():
         """Data must be a string. Removes the extension from a string that represents a file name. If there is no extension, nothing is changed."""
 
         if type(self.data) != str:
-            logger.error(f'data type is {type(self.data)}. Must be a string')
+            logger.error('data type is %s. Must be a string', type(self.data))
             return None
 
         new_name = self.data.partition(".")[0]
@@ -315,7 +684,7 @@ class DataFormatting():
         return cols
 
     def create_insert_into_statement(df:DataFrame):
-        """! DEPRECATED !
+        """! DEPRECATED ! Use ``create_insert_statements()`` instead.
 
         Creates a string with an INSERT INTO stament for evey row in the DataFrame
         """
@@ -328,29 +697,268 @@ class DataFormatting():
 
         return sql
 
-    def create_data_list(self) -> list:
+    @instrumented("create_data_list")
+    def create_data_list(self, typed:bool = False) -> list:
         """
         Data must be DataFrame type
 
         Creates a list of tuples from the the df. Tuples represent rows; objects in a tuple represent a cell.
 
+        If `typed` is True, cells keep native Python types instead of being turned into strings (see
+        ``typed_value()``), so DB drivers do not have to parse them back.
+
         Returns:
         list: Every tuple represents a row in the input DataFrame.
         """
-        if type(self.data) != DataFrame:
+        if not is_dataframe(self.data):
             logger.error("Data object is not a DataFrame. Cannot proceed")
             return None
 
-        data_list = []
-        for index, row in self.data.iterrows():
-            new_row = tuple([row_processing(x) for x in row]) # creating a new tuple with all values converted to strings
-            data_list.append(new_row) # appending new tuple into list
+        # converting whole columns at once and zipping them back into row tuples
+        columns = typed_columns(self.data) if typed else processed_columns(self.data)
+        if not columns:
+            return [() for index in range(len(self.data))]
+
+        data_list = list(zip(*columns))
+
+        if instrumentation.enabled:
+            instrumentation.add("create_data_list", rows = len(data_list), columns = len(columns))
 
         return data_list
 
+    def iter_data_batches(self, batch_size:int = 10000, typed:bool = False):
+        """
+        Data must be DataFrame type
+
+        Generator version of ``create_data_list()``. Converts and yields the rows of the df in lists of at most
+        `batch_size` tuples, so only one batch is held in memory at a time. Every batch can be handed straight
+        to a DB driver's ``executemany()``. `typed` works as in ``create_data_list()``.
+
+        Yields:
+        list: Every tuple represents a row in the input DataFrame.
+        """
+        if not is_dataframe(self.data):
+            logger.error("Data object is not a DataFrame. Cannot proceed")
+            return
+
+        if batch_size < 1:
+            logger.error("batch_size must be a positive integer. Got %s", batch_size)
+            return
+
+        for start in range(0, len(self.data), batch_size):
+            batch = self.data.iloc[start:start + batch_size]
+
+            columns = typed_columns(batch) if typed else processed_columns(batch)
+            if not columns:
+                yield [() for index in range(len(batch))]
+                continue
+
+            yield list(zip(*columns))
+
+    def create_columns(self, arrays:bool = False) -> list:
+        """
+        Data must be DataFrame type
+
+        Columnar counterpart of ``create_data_list(typed = True)`` for bulk loaders. Returns one list of typed values
+        per column, in the order of the df columns, without building a tuple per row.
+
+        If `arrays` is True, every column is returned as a NumPy array instead: bool columns become uint8 arrays
+        of 1/0 and numeric columns without NULLs keep their dtype. Columns holding NULLs, strings or other objects
+        become object arrays with None for every NULL.
+
+        Returns:
+        list: Every list or array holds the values of one column of the input DataFrame.
+        """
+        if not is_dataframe(self.data):
+            logger.error("Data object is not a DataFrame. Cannot proceed")
+            return None
+
+        if arrays:
+            return typed_arrays(self.data)
+        return typed_columns(self.data)
+
+    def iter_insert_statements(self, table:str, batch_size:int = 1000, parameterized:bool = False, placeholder:str = "?"):
+        """
+        Data must be DataFrame type
+
+        Yields one multi-row ``INSERT INTO <table> (...) VALUES (...), (...);`` statement for every `batch_size` rows
+        of the df. Every row is converted only once, with the value rules of ``value_string()`` (see ``sql_value()``).
+
+        - table: name of the table the rows are inserted into.
+        - batch_size: maximum number of rows in each statement.
+        - parameterized: if True, yields ``(statement, params)`` tuples where the statement holds `placeholder`
+        markers and params is the flat list of values for them (see ``sql_parameter()``).
+        """
+        if not is_dataframe(self.data):
+            logger.error("Data object is not a DataFrame. Cannot proceed")
+            return
+
+        if batch_size < 1:
+            logger.error("batch_size must be a positive integer. Got %s", batch_size)
+            return
+
+        cols = DataFormatting.cols_string(self.data)
+        prefix = f"INSERT INTO {table} ({cols}) VALUES "
+
+        for start in range(0, len(self.data), batch_size):
+            batch = self.data.iloc[start:start + batch_size]
+
+            columns = []
+            for position in range(batch.shape[1]):
+                column = batch.iloc[:, position]
+                nulls = column.isna().tolist()
+                columns.append([None if null else value for value, null in zip(column.tolist(), nulls)])
+
+            if parameterized:
+                rows = []
+                params = []
+                for row in zip(*columns):
+                    fragments = []
+                    for value in row:
+                        fragment, param = sql_parameter(value, placeholder)
+                        fragments.append(fragment)
+                        params.append(param)
+                    rows.append(f"({', '.join(fragments)})")
+                yield prefix + ", ".join(rows) + ";", params
+            else:
+                columns = [[sql_value(value) for value in column] for column in columns]
+                rows = [f"({', '.join(row)})" for row in zip(*columns)]
+                yield prefix + ", ".join(rows) + ";"
+
+    def create_insert_statements(self, table:str, batch_size:int = 1000) -> str:
+        """
+        Data must be DataFrame type
+
+        Creates a string with multi-row INSERT INTO statements for every row in the df, one statement per
+        `batch_size` rows. Replaces ``create_insert_into_statement()``.
+        """
+        if not is_dataframe(self.data):
+            logger.error("Data object is not a DataFrame. Cannot proceed")
+            return None
+
+        return "\n".join(self.iter_insert_statements(table, batch_size = batch_size))
+
+    @instrumented("to_sqlite")
+    def to_sqlite(self, database, table:str, batch_size:int = 10000, transaction_size:int = 100000,
+                  pragmas:dict = None, create:bool = True, typed:bool = False) -> dict:
+        """
+        Data must be DataFrame type
+
+        Streams the rows of the df into `table` of a SQLite database with ``executemany()``, one call per batch of
+        ``iter_data_batches(batch_size, typed)``, so values follow the ``row_processing()`` rules (or the
+        ``typed_value()`` rules if `typed` is True) and only one batch is held in memory at a time. Typed values SQLite
+        cannot bind, such as Timestamps or Decimals, are converted with ``sqlite_value()``.
+
+        `database` is a path or an open ``sqlite3.Connection``; a path is opened and closed here. Rows are committed
+        every `transaction_size` rows, rounded up to whole batches, and a failing transaction is rolled back before
+        the error is raised again. `pragmas` maps PRAGMA names to values and defaults to ``sqlite_pragmas``; pass an
+        empty dict to leave the connection as it is. PRAGMAs set on a connection given by the caller are restored
+        to their previous values once the load is done. If `create` is True, an untyped table with the df columns is
+        created when it does not exist.
+
+        Every write of the loader is made under a ``SAVEPOINT``, so work it did not do is never committed or rolled
+        back. If the connection already has a pending transaction, the rows are loaded into it and left for the
+        caller to commit, a failure only undoes the loader's own writes, and PRAGMAs are skipped, since SQLite does
+        not allow changing them inside a transaction.
+
+        Returns:
+        dict: the table, the number of rows, batches and committed transactions, the elapsed seconds and the rows
+        per second.
+        """
+        if not is_dataframe(self.data):
+            logger.error("Data object is not a DataFrame. Cannot proceed")
+            return None
+
+        if len(self.data.columns) == 0:
+            logger.error("DataFrame has no columns. Cannot proceed")
+            return None
+
+        import sqlite3
+
+        connection = sqlite3.connect(database) if isinstance(database, (str, os.PathLike)) else database
+        table_name = sqlite_identifier(table)
+        columns = ", ".join(sqlite_identifier(column) for column in self.data.columns)
+        statement = f"INSERT INTO {table_name} ({columns}) VALUES ({', '.join('?' * len(self.data.columns))})"
+
+        # releasing the outermost savepoint commits, so the loader only commits transactions it started itself
+        owned = not connection.in_transaction
+        if pragmas is None:
+            pragmas = self.sqlite_pragmas
+        if not owned:
+            logger.warning("Connection has a pending transaction. Rows are loaded into it and left for the caller to commit. PRAGMAs skipped.")
+            pragmas = {}
+
+        # typed values SQLite cannot bind can only come out of datetime, timedelta or object columns
+        convert = [position for position, dtype in enumerate(self.data.dtypes) if dtype.kind in "MmO"] if typed else []
+
+        report = {"table": table, "rows": 0, "batches": 0, "transactions": 0}
+        previous = {}
+        start = time.perf_counter()
+        try:
+            for name, value in pragmas.items():
+                if connection is database:
+                    previous[name] = connection.execute(f"PRAGMA {name}").fetchone()[0]
+                connection.execute(f"PRAGMA {name} = {value}")
+
+            connection.execute("SAVEPOINT to_sqlite")
+            pending = 0
+            try:
+                if create:
+                    connection.execute(f"CREATE TABLE IF NOT EXISTS {table_name} ({columns})")
+
+                for batch in self.iter_data_batches(batch_size = batch_size, typed = typed):
+                    if convert:
+                        batch = [sqlite_row(row, convert) for row in batch]
+                    connection.executemany(statement, batch)
+                    report["rows"] += len(batch)
+                    report["batches"] += 1
+                    pending += len(batch)
+
+                    if owned and pending >= transaction_size:
+                        connection.execute("RELEASE to_sqlite")
+                        report["transactions"] += 1
+                        pending = 0
+                        connection.execute("SAVEPOINT to_sqlite")
+            except BaseException:
+                try:
+                    connection.execute("ROLLBACK TO to_sqlite")
+                    connection.execute("RELEASE to_sqlite")
+                except sqlite3.Error:
+                    # SQLite already rolled the whole transaction back
+                    pass
+                raise
+
+            connection.execute("RELEASE to_sqlite")
+            if owned and pending:
+                report["transactions"] += 1
+        finally:
+            if connection is not database:
+                connection.close()
+            else:
+                for name, value in previous.items():
+                    connection.execute(f"PRAGMA {name} = {value}")
+
+        report["seconds"] = time.perf_counter() - start
+        report["rows_per_s"] = report["rows"] / report["seconds"] if report["seconds"] else 0.0
+        logger.info("%s rows loaded into %s in %.3fs (%.0f rows/s)", report["rows"], Colored(table, "GREEN"), report["seconds"], report["rows_per_s"])
+
+        if instrumentation.enabled:
+            instrumentation.add("to_sqlite", rows = report["rows"], batches = report["batches"])
+
+        return report
+
 class ManageTestFiles():
     """Manages creation and deletion of files for test purposes. `path` argument must be a directory path and
-    not a file path. A `.csv` file named `demofile.<extension>` will be created in this directory."""
+    not a file path. A `.csv` file named `demofile.<extension>` will be created in this directory.
+
+    If `compression` is "gzip", "bz2" or "xz", files are compressed while they are written, with the stdlib codec
+    of that name, at `compression_level` (the default level of ``compressions`` if None), and the codec extension
+    is added to the file name."""
+
+    # file extension and default level of every supported compression. gzip and xz use low levels, several times
+    # faster than their codec defaults on generated data for a slightly larger file. bz2 keeps its default, 9: its
+    # level only sets the block size, which barely changes its speed
+    compressions = {"gzip": ("gz", 1), "bz2": ("bz2", 9), "xz": ("xz", 1)}
 
     def __init__(self,
                  path:str = "",
@@ -358,9 +966,14 @@ class ManageTestFiles():
                  multiple_files:bool = False,
                  header = "file header\n",
                  lines = "file line ",
-                 line_number = 1
+                 line_number = 1,
+                 compression:str = None,
+                 compression_level:int = None
 ) -> None:
 
+        if compression is not None and compression not in self.compressions:
+            raise ValueError(f"compression must be one of {list(self.compressions)} or None, got {compression!r}")
+
         self.set_path(path)
         try: self.safety_lock()
         except FileSafetyException: return
@@ -371,19 +984,35 @@ class ManageTestFiles():
         self.line_number = line_number
         self.multiple_files = multiple_files
         self.file_counter = 0
+        self.compression = compression
+        self.compression_level = compression_level
 
         logger.info("setup finished.")
 
-    def create(self, show = False) -> bool:
-        """Creates a test file in the directory specified by ``self.path``. returns True if operation was successful and False otherwise."""
+    @instrumented("create")
+    def create(self, show = False, lines = None) -> bool:
+        """Creates a test file in the directory specified by ``self.path``. returns True if operation was successful and False otherwise.
+
+        `lines` may be any iterable of strings, including a generator. The header and the lines are written in a
+        single pass, so lines produced by a generator never need to be held in memory. If `lines` is not given,
+        ``self.line_list`` is used if it exists and ``self.standard_lines()`` otherwise."""
         try: self.safety_lock()
         except FileSafetyException: return False
 
+        # choosing the line source
+        if lines is None:
+            if not hasattr(self,"line_list"):
+                logger.debug("%s.%s does not exist. Using %s.%s.", Colored("self", "BLUE"), Colored("line_list", "YELLOW"), Colored("self", "BLUE"), Colored("standard_lines()", "YELLOW"))
+                lines = self.standard_lines()
+            else:
+                logger.debug("%s.%s exists. Skipping %s.%s.", Colored("self", "BLUE"), Colored("line_list", "YELLOW"), Colored("self", "BLUE"), Colored("standard_lines()", "YELLOW"))
+                lines = self.line_list
+
         try:
             # creating/overriding file
-            self.creation_block()
+            self.write_lines(lines)
         except FileNotFoundError:
-            logger.warning(f"Directory {self.path} does not exist. Defaulting to current working directory.")
+            logger.warning("Directory %s does not exist. Defaulting to current working directory.", self.path)
 
             # setting path to cwd
             self.set_path("")
@@ -391,34 +1020,292 @@ class ManageTestFiles():
             except FileSafetyException: return False
 
             # creating/overriding file
-            self.creation_block()
-
-        # creating line list of one doesn't exist already
-        if not hasattr(self,"line_list"):
-            logger.debug(f"{Fore.BLUE}self{Fore.RESET}.{Fore.YELLOW}line_list{Fore.RESET} does not exist. Calling {Fore.BLUE}self{Fore.RESET}.{Fore.YELLOW}standard_line_list(){Fore.RESET}.")
-            self.standard_line_list()
-        else:
-            logger.debug(f"{Fore.BLUE}self{Fore.RESET}.{Fore.YELLOW}line_list{Fore.RESET} exists. Skipping {Fore.BLUE}self{Fore.RESET}.{Fore.YELLOW}standard_line_list(){Fore.RESET}.")
+            self.write_lines(lines)
 
-        # inserting lines
-        self.input_lines()
+        if instrumentation.enabled:
+            instrumentation.add("create", files = 1, bytes = os.path.getsize(self.file_name()))
 
         if show:
             self.show_test_file()
 
         return True
 
+    def create_file(self, seed:int = None) -> dict:
+        """Creates the current test file and returns a report with its name, bytes, elapsed seconds and throughput.
+        Standard lines are not random, so `seed` is ignored here; subclasses with random content use it."""
+        start = time.perf_counter()
+        if not self.create():
+            return None
+        seconds = time.perf_counter() - start
+
+        return self.file_report(self.raw_bytes, seconds)
+
+    @instrumented("create_clones")
+    def create_clones(self, count:int, lines = None) -> dict:
+        """Creates `count` identical test files in multiple_files mode. The first file is written once by ``create()``
+        (`lines` works as there) and every other file is a copy of it made by ``clone_file()``, in the kernel where
+        the platform allows it, so the content is generated only once.
+
+        Returns a summary with the files, the copy methods used, total bytes, elapsed and CPU seconds and throughput.
+        """
+        try: self.safety_lock()
+        except FileSafetyException: return None
+
+        if not self.multiple_files:
+            logger.error("Clones need %s. Every file would have the same name otherwise.", Colored("multiple_files", "BLUE"))
+            return None
+
+        if count < 1:
+            logger.error("count must be a positive integer. Got %s", count)
+            return None
+
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        if not self.create(lines = lines):
+            return None
+
+        source = self.file_name()
+        files = [source]
+        methods = {}
+        for number in range(count - 1):
+            self.file_counter += 1
+            method = clone_file(source, self.file_name())
+            methods[method] = methods.get(method, 0) + 1
+            files.append(self.file_name())
+        seconds = time.perf_counter() - start
+
+        summary = throughput_report(os.path.getsize(source) * count, seconds, files = files, methods = methods,
+                                    cpu_seconds = time.process_time() - cpu_start)
+        summary["files_per_s"] = count / seconds if seconds else 0.0
+        logger.info("%s identical test files created in %.3fs: %s", count, seconds, methods)
+
+        if instrumentation.enabled:
+            instrumentation.add("create_clones", files = count, bytes = summary["bytes"])
+
+        return summary
+
+    @instrumented("create_sized")
+    def create_sized(self, size:int, chunk_size:int = 1 << 24, preallocate:bool = True, sync:bool = False, seed:int = None) -> dict:
+        """Creates the current test file with exactly `size` bytes, for load-testing disk-bound pipelines.
+
+        The file is preallocated with ``os.posix_fallocate()`` where available (unless `preallocate` is False). After
+        the header, a template of whole lines built once by ``sized_template()`` is repeated and written in chunks of
+        `chunk_size` bytes that start at multiples of `chunk_size` in the file; the last chunk is cut at `size`, so
+        the last line may be incomplete. If `sync` is True the file is flushed to disk with ``os.fsync()`` before
+        the clock stops. `seed` is passed to ``sized_template()``.
+
+        Returns a report with the file name, bytes, elapsed seconds, throughput in MB/s and whether the file was
+        preallocated. Size targets apply to uncompressed files only.
+        """
+        try: self.safety_lock()
+        except FileSafetyException: return None
+
+        if self.compression:
+            logger.error("Size targets apply to uncompressed files only. Cannot create a sized %s file.", Colored(self.compression, "YELLOW"))
+            return None
+
+        if size < 0 or chunk_size < 1:
+            logger.error("size must not be negative and chunk_size must be positive. Got %s and %s", size, chunk_size)
+            return None
+
+        if self.multiple_files:
+            self.file_counter += 1
+            logger.debug("Increasing %s. New value: %s", Colored("file_counter", "BLUE"), self.file_counter)
+
+        template = self.sized_template(min(chunk_size, 1 << 20), seed = seed) or b"\n"
+        # a chunk may start anywhere in the template, so the buffer holds one chunk past a whole template
+        buffer = memoryview(template * (min(chunk_size, size) // len(template) + 2))
+        header = self.header.encode()[:size]
+
+        start = time.perf_counter()
+        preallocated = False
+        with self.file_opener("wb", buffering = 0) as f:
+            if preallocate and size and hasattr(os, "posix_fallocate"):
+                try:
+                    os.posix_fallocate(f.fileno(), 0, size)
+                    preallocated = True
+                except OSError as e:
+                    logger.warning("Could not preallocate %s: %s", Colored(self.file_name(), "GREEN"), e)
+
+            write_fully(f, header)
+            written = len(header)
+            offset = 0
+            while written < size:
+                length = min(chunk_size - written % chunk_size, size - written)
+                write_fully(f, buffer[offset:offset + length])
+                written += length
+                offset = (offset + length) % len(template)
+
+            if sync:
+                os.fsync(f.fileno())
+        seconds = time.perf_counter() - start
+
+        report = self.file_report(written, seconds, preallocated = preallocated)
+        logger.info("Sized test file created: %s", report)
+
+        if instrumentation.enabled:
+            instrumentation.add("create_sized", files = 1, bytes = written)
+
+        return report
+
+    def sized_template(self, template_size:int, seed:int = None) -> bytes:
+        """Returns the standard lines, each preceded by a newline as in ``write_lines()``, up to the first line that
+        makes them reach `template_size` bytes. Standard lines are not random, so `seed` is ignored here."""
+        parts = []
+        total = 0
+        for line in self.standard_lines():
+            part = ("\n" + line).encode()
+            parts.append(part)
+            total += len(part)
+            if total >= template_size:
+                break
+
+        return b"".join(parts)
+
+    def create_many(self, count:int, processes:int = None, seed:int = None) -> dict:
+        """Creates `count` test files concurrently in a process pool of `processes` workers.
+
+        Every file gets the next unused ``file_counter`` value and its own seed, spawned from `seed` with
+        ``numpy.random.SeedSequence``, so the same `seed` always gives the same set of files. Every worker
+        verifies the ``testmarker`` of the test area again before writing.
+
+        Returns a summary with the per-file reports, failures, total bytes, elapsed seconds and throughput.
+        """
+        try: self.safety_lock()
+        except FileSafetyException: return None
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        first_counter = self.file_counter + 1
+        seeds = np.random.SeedSequence(seed).spawn(count)
+
+        start = time.perf_counter()
+        outcomes = []
+        with ProcessPoolExecutor(max_workers = processes) as pool:
+            futures = {pool.submit(create_test_file, self, first_counter + number, seeds[number]): first_counter + number
+                       for number in range(count)}
+            for future in futures:
+                try:
+                    outcomes.append((futures[future], future.result()))
+                except (FileSafetyException, OSError) as e:
+                    outcomes.append((futures[future], e))
+        seconds = time.perf_counter() - start
+
+        self.file_counter = first_counter + count - 1
+
+        return creation_summary(outcomes, seconds)
+
+    async def acreate(self, show = False, lines = None, executor = None) -> bool:
+        """Asyncio version of ``create()``. The file is written in `executor` (the loop's default executor if None),
+        so the event loop is not blocked. Applies the same safety checks and returns the same result as ``create()``."""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(self.create, show = show, lines = lines))
+
+    async def acreate_many(self, count:int, concurrency:int = 4, seed:int = None, executor = None) -> dict:
+        """Asyncio version of ``create_many()``. Creates `count` test files in `executor` (the loop's default executor
+        if None), with at most `concurrency` files being written at a time.
+
+        Every file is written by its own copy of the manager, with the next unused ``file_counter`` value and its own
+        seed, exactly as in ``create_many()``, and every copy verifies the ``testmarker`` of the test area again.
+        Counters are reserved before the first await, so concurrent calls on the same manager never share a file.
+
+        Returns the same summary as ``create_many()``.
+        """
+        try: self.safety_lock()
+        except FileSafetyException: return None
+
+        import asyncio, copy
+
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(concurrency)
+        first_counter = self.file_counter + 1
+        seeds = np.random.SeedSequence(seed).spawn(count)
+        self.file_counter = first_counter + count - 1
+
+        async def create_one(number:int) -> tuple:
+            file_counter = first_counter + number
+            async with semaphore:
+                try:
+                    report = await loop.run_in_executor(executor, create_test_file, copy.copy(self), file_counter, seeds[number])
+                except (FileSafetyException, OSError) as e:
+                    return file_counter, e
+            return file_counter, report
+
+        start = time.perf_counter()
+        outcomes = await asyncio.gather(*(create_one(number) for number in range(count)))
+        seconds = time.perf_counter() - start
+
+        return creation_summary(outcomes, seconds)
+
     def safety_lock(self):
-        """Raises FileSafetyException if path attribute has not been defined."""
+        """Raises FileSafetyException if path attribute has not been defined or if the ``testmarker`` of the path has
+        been removed since. Every call touches the filesystem: the marker is verified again with ``has_marker()``,
+        which costs one ``os.stat()`` whatever the size of the directory."""
         logger.debug("Applying safety check")
         if not hasattr(self,"path"):
-            logger.error(f"self does not contain the {Fore.BLUE}path{Fore.RESET} attribute. Safety lock engaged. Returning {Fore.RED}FileSafetyException{Fore.RESET}.")
+            logger.error("self does not contain the %s attribute. Safety lock engaged. Returning %s.", Colored("path", "BLUE"), Colored("FileSafetyException", "RED"))
+            raise FileSafetyException
+        try:
+            marked = has_marker(self.path)
+        except FileNotFoundError:
+            marked = False
+        if not marked:
+            logger.error("%s is no longer marked as a testing area. Safety lock engaged. Returning %s.", Colored(self.path, "GREEN"), Colored("FileSafetyException", "RED"))
             raise FileSafetyException
         logger.debug("Safety check passed")
 
-    def file_opener(self, mode:str):
-        """Calls ``open()`` function and passes the `mode` argument."""
-        return open(f"{self.path}demofile{self.file_counter}.{self.ext}", mode)
+    def file_name(self) -> str:
+        """Returns the path of the current test file, with the extension of the compression if there is one."""
+        if self.compression:
+            return f"{self.path}demofile{self.file_counter}.{self.ext}.{self.compressions[self.compression][0]}"
+        return f"{self.path}demofile{self.file_counter}.{self.ext}"
+
+    def file_opener(self, mode:str, buffering:int = -1):
+        """Calls ``open()`` function and passes the `mode` and `buffering` arguments. Compressed files are opened with
+        the ``open()`` function of their codec instead, in text mode unless `mode` asks for binary."""
+        if not self.compression:
+            return open(self.file_name(), mode, buffering = buffering)
+
+        if "b" not in mode and "t" not in mode:
+            mode += "t"
+        level = self.compressions[self.compression][1] if self.compression_level is None else self.compression_level
+
+        if self.compression == "gzip":
+            import gzip
+            return gzip.open(self.file_name(), mode, compresslevel = level)
+        if self.compression == "bz2":
+            import bz2
+            return bz2.open(self.file_name(), mode, compresslevel = level)
+        import lzma
+        return lzma.open(self.file_name(), mode, preset = None if "r" in mode else level)
+
+    def file_report(self, written:int, seconds:float, **fields) -> dict:
+        """Returns the ``throughput_report()`` of the current test file, where `written` is the number of bytes
+        written before compression. Reports of compressed files also hold the size of the file on disk."""
+        if self.compression:
+            fields["compressed_bytes"] = os.path.getsize(self.file_name())
+        return throughput_report(written, seconds, file = self.file_name(), **fields)
+
+    def write_lines(self, lines, buffer_size:int = 1 << 20) -> None:
+        """Creates or overrides the file and writes the header followed by every string in `lines`, each on
+        a new line, through a single file handle with a `buffer_size` bytes buffer. Compressed files are
+        compressed as the lines are written. The number of bytes written before compression is saved as
+        ``self.raw_bytes``."""
+        try: self.safety_lock()
+        except FileSafetyException: return
+
+        if self.multiple_files:
+            self.file_counter += 1
+            logger.debug("Increasing %s. New value: %s", Colored("file_counter", "BLUE"), self.file_counter)
+
+        logger.debug("Writing header and lines in file")
+        with self.file_opener("w", buffering = buffer_size) as f:
+            f.write(self.header)
+            f.writelines("\n" + line for line in lines)
+            f.flush()
+            self.raw_bytes = f.buffer.tell()
 
     def creation_block(self):
         """Basic bulding block for creating or overriding the file."""
@@ -427,13 +1314,13 @@ class ManageTestFiles():
 
         if self.multiple_files:
             self.file_counter += 1
-            logger.debug(f"Increasing {Fore.BLUE}file_counter{Fore.RESET}. New value: {self.file_counter}")
+            logger.debug("Increasing %s. New value: %s", Colored("file_counter", "BLUE"), self.file_counter)
 
         try:
             with self.file_opener("x") as f:
                 f.write(self.header)
         except FileExistsError:
-            logger.debug(f"File already exists. Overriding.")
+            logger.debug("File already exists. Overriding.")
             with self.file_opener("w") as f:
                 f.truncate(0)
                 f.write(self.header)
@@ -447,18 +1334,73 @@ class ManageTestFiles():
             print(f"\nShowing new test file on path {Fore.GREEN + self.path + Fore.RESET}:\n")
             print(f.read())
 
+    def preview_test_file(self, lines:int = 10, show:bool = False, max_line_bytes:int = 4096, chunk_size:int = 1 << 24) -> dict:
+        """Previews the test file on ``path`` without reading it into memory. The file is memory-mapped and only
+        the first and last `lines` lines are copied out, each truncated to `max_line_bytes` bytes. The line count
+        is computed by scanning the mapping in chunks of `chunk_size` bytes.
+
+        Returns a dict with the file name, its size in bytes, its line count and the head and tail lines. If `show`
+        is True, the preview is also printed."""
+        try: self.safety_lock()
+        except FileSafetyException: return None
+
+        if self.compression:
+            logger.error("%s is compressed and cannot be memory-mapped. Use %s instead.", Colored(self.file_name(), "GREEN"), Colored("show_test_file()", "YELLOW"))
+            return None
+
+        file_name = self.file_name()
+        size = os.path.getsize(file_name)
+        preview = {"file": file_name, "size": size, "line_count": 0, "head": [], "tail": []}
+
+        if size:
+            with open(file_name, "rb") as f, mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ) as mapping:
+                newlines = 0
+                for start in range(0, size, chunk_size):
+                    newlines += mapping[start:start + chunk_size].count(b"\n")
+                ends_with_newline = mapping[size - 1] == ord("\n")
+                preview["line_count"] = newlines + (0 if ends_with_newline else 1)
+
+                head = []
+                position = 0
+                while len(head) < lines and position < size:
+                    end = mapping.find(b"\n", position)
+                    if end == -1: end = size
+                    head.append(mapping[position:min(end, position + max_line_bytes)])
+                    position = end + 1
+
+                tail = []
+                end = size - 1 if ends_with_newline else size
+                while len(tail) < lines and end >= 0:
+                    start = mapping.rfind(b"\n", 0, end) + 1
+                    tail.append(mapping[start:min(end, start + max_line_bytes)])
+                    end = start - 1
+                tail.reverse()
+
+            preview["head"] = [line.decode(errors = "replace") for line in head]
+            preview["tail"] = [line.decode(errors = "replace") for line in tail]
+
+        if show:
+            print(f"\nPreviewing test file {Colored(file_name, 'GREEN')} ({size} bytes, {preview['line_count']} lines):\n")
+            print("\n".join(preview["head"]))
+            if preview["line_count"] > 2 * lines:
+                print("...")
+                print("\n".join(preview["tail"]))
+            elif preview["line_count"] > lines:
+                print("\n".join(preview["tail"][lines - preview["line_count"]:]))
+
+        return preview
+
     def standard_line_list(self):
         """Creates a list of file lines according to standard parameters."""
         try: self.safety_lock()
         except FileSafetyException: return
 
-        counter = 0
-        line_list = []
-        while counter <= self.line_number:
-            line_list.append(self.lines + str(counter))
-            counter += 1
+        self.line_list = list(self.standard_lines())
 
-        self.line_list = line_list
+    def standard_lines(self):
+        """Generator of the file lines according to standard parameters."""
+        for counter in range(self.line_number + 1):
+            yield self.lines + str(counter)
 
     def input_lines(self):
         """Insertes strings in self.line_list into file."""
@@ -466,66 +1408,65 @@ class ManageTestFiles():
         except FileSafetyException: return
 
         logger.debug("Inserting lines in files")
+        debug = logger.isEnabledFor(logging.DEBUG)
         with self.file_opener("a") as f:
             for line in self.line_list:
-                logger.debug(f"Inserting line {line}")
+                if debug: logger.debug("Inserting line %s", line)
                 f.write("\n" + line)
 
     def set_path(self, newpath:str) -> None:
         """Checks if chosen path contains the ``testmarker`` file. Sets ``self.path = newpath`` if
         and only if this check is successful."""
 
-        # making list of files in newpath
         if newpath == "":
-            logger.debug(f"{Fore.BLUE}newpath{Fore.RESET} string empty. defaulting to current working directory.")
+            logger.debug("%s string empty. defaulting to current working directory.", Colored("newpath", "BLUE"))
             newpath = os.getcwd()
-        dir_list = os.listdir(newpath)
 
-        logger.info(f"Setting test file path to {Fore.GREEN + newpath + Fore.RESET}")
-        logger.debug(f"Files in {newpath}: {dir_list}")
+        logger.info("Setting test file path to %s", Colored(newpath, "GREEN"))
 
         try:
             self.newpath_check(newpath)
         except FileNotFoundError:
-            logger.warning(f"path {Fore.YELLOW + newpath + Fore.RESET} not found. Defaulting to current working directory.")
+            logger.warning("path %s not found. Defaulting to current working directory.", Colored(newpath, "YELLOW"))
             self.newpath_check(newpath)
 
     def newpath_check(self, newpath) -> None:
         """Verifies if newpath is valid directory that is marked as a test area. If the Check passes, saves
-        it as self.newpath and returns warningmessages otherwise."""
-
-        dir_list = os.listdir(newpath)
+        it as self.newpath and returns warningmessages otherwise. The marker is looked up with a single stat through
+        ``has_marker()``, so the check costs the same whatever the size of the directory."""
 
         try:
             if newpath[-1] != "/":
                 raise NotDirectoryException
-            if "testmarker" not in dir_list:
+            if not has_marker(newpath):
                 raise FileSafetyException
-            logger.info(f"{Fore.GREEN + newpath + Fore.RESET} verified as test area. Proceeding with setup.")
+            logger.info("%s verified as test area. Proceeding with setup.", Colored(newpath, "GREEN"))
             self.path = newpath
         except FileSafetyException:
-            logger.error(f"""
+            logger.error("""
 
-{Fore.GREEN + newpath + Fore.RESET} directory is {Fore.RED}NOT{Fore.RESET} marked as a testing area. Cancelling operation for safety reasons.
+%s directory is %s marked as a testing area. Cancelling operation for safety reasons.
 
-To mark this directory as a testing area, create a file named {Fore.BLUE}testmarker{Fore.RESET} in it.
+To mark this directory as a testing area, create a file named %s in it.
 
-""")
+""", Colored(newpath, "GREEN"), Colored("NOT", "RED"), Colored("testmarker", "BLUE"))
         except NotDirectoryException:
-            logger.error(f"""
+            logger.error("""
 
-path {Fore.GREEN + newpath + Fore.RESET} points to a file, but should point to a directory instead.
+path %s points to a file, but should point to a directory instead.
 
-""")
+""", Colored(newpath, "GREEN"))
 
+    @instrumented("clear_folder")
     def clear_folder(self) -> bool:
         try: self.safety_lock()
         except FileSafetyException: return False
         """Deletes all files in the specified directory."""
 
-        logger.info(f"{Fore.RED}Wiping all files in {Fore.GREEN + self.path}")
+        logger.info("%s %s", Colored("Wiping all files in", "RED"), Colored(self.path, "GREEN"))
 
         dir_list = os.listdir(self.path)
+        removed = 0
 
         for file_name in dir_list:
             file_path = os.path.join(self.path, file_name)
@@ -536,68 +1477,192 @@ path {Fore.GREEN + newpath + Fore.RESET} points to a file, but should point to a
                     os.unlink(file_path)
                 elif os.path.isdir(file_path):
                     shutil.rmtree(file_path)
+                removed += 1
             except Exception as e:
                 print('Failed to delete %s. Reason: %s' % (file_path, e))
 
-        logger.info(f"{Fore.RED}Files wiped")
+        if instrumentation.enabled:
+            instrumentation.add("clear_folder", entries = removed)
+
+        logger.info("%s", Colored("Files wiped", "RED"))
 
         return True
 
+    async def aclear_folder(self, executor = None) -> bool:
+        """Asyncio version of ``clear_folder()``. The files are deleted in `executor` (the loop's default executor if
+        None), so the event loop is not blocked. Applies the same safety checks and returns the same result."""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self.clear_folder)
+
+    def clear_folder_parallel(self, workers:int = None) -> dict:
+        """Deletes all files in the specified directory, except ``testmarker``, through a pool of `workers` threads
+        (by default as many as ``ThreadPoolExecutor`` would use).
+
+        Entries are listed once with ``os.scandir()`` and their cached types decide how they are deleted, so no extra
+        ``isfile``/``isdir`` calls are made. Returns a summary with the number of files and directories removed, the
+        bytes freed, the elapsed seconds and a list of failures, instead of printing every error."""
+        try: self.safety_lock()
+        except FileSafetyException: return None
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        logger.info("%s %s", Colored("Wiping all files in", "RED"), Colored(self.path, "GREEN"))
+
+        start = time.perf_counter()
+        with os.scandir(self.path) as entries:
+            targets = [entry for entry in entries if entry.name != "testmarker"]
+
+        # one chunk of entries per worker keeps the number of futures small on huge directories
+        if workers is None:
+            workers = min(32, (os.cpu_count() or 1) + 4)
+        workers = max(1, min(workers, len(targets)))
+        chunks = [targets[number::workers] for number in range(workers)]
+        with ThreadPoolExecutor(max_workers = workers) as pool:
+            results = list(pool.map(remove_entries, chunks))
+
+        summary = {"files": sum(result["files"] for result in results),
+                   "directories": sum(result["directories"] for result in results),
+                   "bytes": sum(result["bytes"] for result in results),
+                   "seconds": time.perf_counter() - start,
+                   "failures": [failure for result in results for failure in result["failures"]]}
+
+        logger.info("%s: %s files, %s directories, %s bytes in %.3fs, %s failures", Colored("Files wiped", "RED"),
+                    summary["files"], summary["directories"], summary["bytes"], summary["seconds"], len(summary["failures"]))
+
+        return summary
+
 class ManageTestCsvFiles(ManageTestFiles):
 
     def __init__(self,
                  path:str = "",
                  multiple_files:bool = False,
                  column_number = 3,
-                 line_number = 1
+                 line_number = 1,
+                 compression:str = None,
+                 compression_level:int = None
 ) -> None:
-        try: self.safety_lock()
-        except FileSafetyException: return
-
         super().__init__(   path = path,
                             ext = "csv",
                             multiple_files = multiple_files,
-                            line_number = line_number
+                            line_number = line_number,
+                            compression = compression,
+                            compression_level = compression_level
 )
+        try: self.safety_lock()
+        except FileSafetyException: return
+
         self.column_number = column_number
         self.csv_header()
-        self.csv_line_list()
 
+    @instrumented("create_csv")
     def create_csv(self, show:bool = False):
         """Create test csv file according to attributes."""
         try: self.safety_lock()
         except FileSafetyException: return
 
-        self.csv_line_list()
-
         self.csv_header()
 
-        self.create(show = show)
+        self.create(show = show, lines = self.csv_lines())
+
+        if instrumentation.enabled:
+            instrumentation.add("create_csv", files = 1, lines = self.line_number + 1, bytes = os.path.getsize(self.file_name()))
+
+    def create_bulk_csv(self, seed:int = None, block_lines:int = 100000, low:int = 1, high:int = 20) -> dict:
+        """Creates the test csv file with vectorized random data. Every block of `block_lines` lines is drawn
+        from a NumPy generator in one call, formatted with ``csv_block()`` and written with a single write.
+
+        Arguments:
+            - `seed`: seed for the random generator. The same seed always gives the same file.
+            - `block_lines`: number of lines generated and written at a time.
+            - `low`, `high`: inclusive range of the random values. Must satisfy ``0 <= low <= high``.
+
+        Returns a report with the file name, number of lines, bytes written, elapsed seconds and throughput in MB/s.
+        Bytes and throughput are counted before compression; reports of compressed files add ``compressed_bytes``.
+        Returns None without touching the file if `low` and `high` are invalid.
+        """
+        try: self.safety_lock()
+        except FileSafetyException: return None
+
+        if not 0 <= low <= high:
+            logger.error("low and high must satisfy 0 <= low <= high. Got %s and %s", low, high)
+            return None
+
+        if self.multiple_files:
+            self.file_counter += 1
+            logger.debug("Increasing %s. New value: %s", Colored("file_counter", "BLUE"), self.file_counter)
+
+        rng = np.random.default_rng(seed)
+        total_lines = self.line_number + 1
+        columns = self.column_number + 1
+
+        start = time.perf_counter()
+        with self.file_opener("wb") as f:
+            written = f.write(self.header.encode())
+            for first_line in range(0, total_lines, block_lines):
+                lines = min(block_lines, total_lines - first_line)
+                written += f.write(csv_block(rng.integers(low, high + 1, size = (lines, columns))))
+        seconds = time.perf_counter() - start
+
+        report = self.file_report(written, seconds, lines = total_lines)
+        logger.info("Bulk csv file created: %s", report)
+
+        return report
+
+    def create_file(self, seed:int = None) -> dict:
+        """Creates the current test file with ``create_bulk_csv()`` and returns its report."""
+        return self.create_bulk_csv(seed = seed)
+
+    def sized_template(self, template_size:int, seed:int = None, low:int = 1, high:int = 20) -> bytes:
+        """Returns random csv lines, formatted with ``csv_block()`` from a NumPy generator seeded with `seed`, adding
+        up to at least `template_size` bytes. `low` and `high` work as in ``create_bulk_csv()``; raises ValueError
+        if they do not satisfy ``0 <= low <= high``."""
+        if not 0 <= low <= high:
+            raise ValueError(f"low and high must satisfy 0 <= low <= high, got {low} and {high}")
+
+        rng = np.random.default_rng(seed)
+        columns = self.column_number + 1
+
+        blocks = []
+        total = 0
+        while total < template_size:
+            blocks.append(csv_block(rng.integers(low, high + 1, size = (10000, columns))))
+            total += len(blocks[-1])
+
+        return b"".join(blocks)
+
+    def standard_lines(self):
+        """Csv test files use random csv lines as their standard lines."""
+        return self.csv_lines()
 
     def csv_line_list(self):
-        """Creates files header according to desired number of columns."""
+        """Creates a list of csv lines with random values according to desired number of columns."""
         try: self.safety_lock()
         except FileSafetyException: return
 
-        line_list = []
+        line_list = list(self.csv_lines())
+
+        logger.debug("Line list created: %s", line_list)
+        self.line_list = line_list
+
+    def csv_lines(self):
+        """Generator of csv lines with random values according to desired number of columns."""
+        debug = logger.isEnabledFor(logging.DEBUG)
         line_counter = 0
         while line_counter <= self.line_number:
             line = ''
             column_counter = 0
             while column_counter <= self.column_number:
                 rand_number = str(random.randint(1,20))
-                logger.debug(f"Adding random number to line: {rand_number}")
+                if debug: logger.debug("Adding random number to line: %s", rand_number)
                 line += rand_number
                 line += ","
                 column_counter += 1
             line = line[:-1]
-            line_list.append(line)
-            logger.debug(f"New line list: {line_list}")
+            yield line
             line_counter += 1
 
-        logger.debug(f"Line list created: {line_list}")
-        self.line_list = line_list
-
     def csv_header(self):
         """Creates a header line for a ``.csv`` file"""
         try: self.safety_lock()
@@ -616,13 +1681,14 @@ class ManageTestCsvFiles(ManageTestFiles):
 # ----------------------------------------
 # Functions
 
-def obj_report(_obj):
-    """logs a report with information from _obj parameter"""
+def obj_report(_obj, sample_size:int = None):
+    """logs a report with information from _obj parameter. If `sample_size` is given, statistics computed by
+    ``object_statistics()`` on a sample of that size are added to the report."""
     obj_type = str(type(_obj))
 
     if type(_obj) in (str,int,float):
         obj_value = str(_obj)
-    elif type(_obj) in (tuple, list, DataFrame, dict):
+    elif type(_obj) in (tuple, list, dict) or is_dataframe(_obj):
         obj_value = str(len(_obj))
     else:
         obj_value = "-Could not be determined-"
@@ -635,10 +1701,266 @@ def obj_report(_obj):
 
                      """
 
+    if sample_size is not None:
+        report_str += f"Statistics\t{object_statistics(_obj, sample_size = sample_size)}\n"
+
     logger.debug(report_str)
 
     return report_str
 
+def object_statistics(_obj, sample_size:int = 10000, seed:int = 0) -> dict:
+    """
+    Computes statistics of a large object from a random sample of at most `sample_size` rows (DataFrames) or
+    elements (lists, tuples and dict values), so the cost is bounded by the sample and not by the object.
+
+    Returns a dict with the object size, the number of sampled items and:
+    - DataFrames: estimated deep memory usage, dtype breakdown and, per column, dtype, null ratio and distinct value estimate.
+    - Sequences: estimated deep memory usage, type breakdown of the sample, null ratio and distinct value estimate.
+
+    Numeric column memory is exact; memory of object columns and sequence elements is extrapolated from the sample.
+    Distinct values are estimated with the GEE estimator: sqrt(n/s) * f1 + (d - f1), where d is the number of distinct
+    values in the sample of size s and f1 the number of values seen only once.
+    """
+
+    rng = np.random.default_rng(seed)
+
+    if is_dataframe(_obj):
+        rows = len(_obj)
+        if rows > sample_size:
+            sample = _obj.iloc[np.sort(rng.choice(rows, size = sample_size, replace = False))]
+        else:
+            sample = _obj
+        scale = rows / len(sample) if len(sample) else 0
+
+        memory = int(_obj.index.memory_usage())
+        columns = {}
+        for position, dtype in enumerate(_obj.dtypes):
+            column = sample.iloc[:, position]
+            if isinstance(dtype, np.dtype) and dtype.kind != 'O':
+                memory += int(_obj.iloc[:, position].memory_usage(index = False, deep = False))
+            else:
+                memory += int(column.memory_usage(index = False, deep = True) * scale)
+            columns[str(_obj.columns[position])] = {"dtype": str(dtype),
+                                                    "null_ratio": float(column.isna().mean()) if len(column) else 0.0,
+                                                    "distinct_estimate": distinct_estimate(column.value_counts(dropna = True).tolist(), rows)}
+
+        dtypes = {}
+        for dtype in _obj.dtypes:
+            dtypes[str(dtype)] = dtypes.get(str(dtype), 0) + 1
+
+        return {"type": type(_obj).__name__, "rows": rows, "columns": _obj.shape[1], "sampled": len(sample),
+                "memory_bytes": memory, "dtypes": dtypes, "column_statistics": columns}
+
+    if type(_obj) in (list, tuple, dict):
+        values = list(_obj.values()) if type(_obj) == dict else _obj
+        length = len(values)
+        if length > sample_size:
+            sample = [values[position] for position in np.sort(rng.choice(length, size = sample_size, replace = False)).tolist()]
+        else:
+            sample = list(values)
+        scale = length / len(sample) if sample else 0
+
+        types = {}
+        counts = {}
+        nulls = 0
+        for value in sample:
+            types[type(value).__name__] = types.get(type(value).__name__, 0) + 1
+            if value is None or (type(value) == float and value != value):
+                nulls += 1
+                continue
+            try:
+                counts[value] = counts.get(value, 0) + 1
+            except TypeError:
+                pass
+
+        memory = sys.getsizeof(_obj) + int(sum(sys.getsizeof(value) for value in sample) * scale)
+
+        return {"type": type(_obj).__name__, "length": length, "sampled": len(sample), "memory_bytes": memory,
+                "types": types, "null_ratio": nulls / len(sample) if sample else 0.0,
+                "distinct_estimate": distinct_estimate(list(counts.values()), length)}
+
+    return {"type": type(_obj).__name__, "memory_bytes": sys.getsizeof(_obj)}
+
+def distinct_estimate(frequencies:list, population:int) -> int:
+    """Estimates the number of distinct values in a population from the value frequencies of a sample (GEE estimator)."""
+
+    sampled = sum(frequencies)
+    if not sampled:
+        return 0
+
+    distinct = len(frequencies)
+    if sampled >= population:
+        return distinct
+
+    singletons = sum(1 for frequency in frequencies if frequency == 1)
+    return int(round((population / sampled) ** 0.5 * singletons + distinct - singletons))
+
+def caller_variable(name:str, frame):
+    """Returns the value of variable `name` (optionally followed by dotted attributes) as seen from `frame`,
+    searching its locals, globals and builtins. Raises NameError if the variable does not exist."""
+    base, *attributes = name.split(".")
+    for namespace in (frame.f_locals, frame.f_globals, frame.f_builtins):
+        if base in namespace:
+            value = namespace[base]
+            break
+    else:
+        raise NameError(f"name '{base}' is not defined")
+
+    for attribute in attributes:
+        value = getattr(value, attribute)
+    return value
+
+CELL_WHITESPACE = str.maketrans("\t\n\r", "   ")
+
+def cell_text(value, max_width:int) -> str:
+    """Returns `value` as a single line of at most `max_width` characters, truncated with "..." if needed."""
+    text = str(value).translate(CELL_WHITESPACE)
+    if len(text) > max_width:
+        text = text[:max_width - 3] + "..." if max_width > 3 else text[:max_width]
+    return text
+
+def column_texts(values, max_width:int) -> list:
+    """Returns the values of a column as single line texts of at most `max_width` characters. Values are converted
+    with one ``map(str, ...)``, and only columns that need it are cleaned or truncated value by value."""
+    texts = list(map(str, values))
+    if not texts:
+        return texts
+    joined = "".join(texts)
+    if "\t" in joined or "\n" in joined or "\r" in joined:
+        texts = [text.translate(CELL_WHITESPACE) for text in texts]
+    if max(map(len, texts)) > max_width:
+        texts = [text if len(text) <= max_width else cell_text(text, max_width) for text in texts]
+    return texts
+
+def print_rows(rows, field_names:list, out = None, chunk_size:int = 10000, max_width:int = 40, plain:bool = False) -> int:
+    """Streams `rows` (any iterable of sequences, including a generator) to `out` (``sys.stdout`` by default) in
+    chunks of `chunk_size` rows, so the table is never held in memory. Values wider than `max_width` characters
+    are truncated.
+
+    The table is drawn in PrettyTable's default style, with centered cells. Column widths are taken from the header
+    and the first chunk, and wider values in later chunks are truncated to fit. If `plain` is True, rows are written
+    tab separated, without padding or borders, which is the fastest path. Every row must have one value per field
+    name, as in ``PrettyTable.add_row()``, or ValueError is raised. Returns the number of rows written."""
+    if out is None:
+        out = sys.stdout
+
+    header = [cell_text(name, max_width) for name in field_names]
+    rows = iter(rows)
+    written = 0
+    widths = None
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        for row in chunk:
+            if len(row) != len(header):
+                raise ValueError(f"Row has incorrect number of values, (actual) {len(row)}!={len(header)} (expected)")
+        # converting the chunk column by column
+        columns = [column_texts(column, max_width) for column in zip(*chunk)] if chunk else [[] for name in header]
+
+        if plain:
+            lines = list(map("\t".join, zip(*columns)))
+            if widths is None:
+                widths = True
+                lines.insert(0, "\t".join(header))
+        else:
+            if widths is None:
+                widths = [max([len(name)] + list(map(len, column))) for name, column in zip(header, columns)]
+                border = "+" + "+".join("-" * (width + 2) for width in widths) + "+"
+                lines = [border, "| " + " | ".join(name.center(width) for name, width in zip(header, widths)) + " |", border]
+            else:
+                lines = []
+                columns = [column_texts(column, width) for column, width in zip(columns, widths)]
+            padded = [[text.center(width) for text in column] for column, width in zip(columns, widths)]
+            if padded:
+                padded[0] = ["| " + text for text in padded[0]]
+                padded[-1] = [text + " |" for text in padded[-1]]
+            lines.extend(map(" | ".join, zip(*padded)))
+            if len(chunk) < chunk_size:
+                lines.append(border)
+
+        if lines:
+            out.write("\n".join(lines) + "\n")
+        written += len(chunk)
+
+        if len(chunk) < chunk_size:
+            return written
+
+def has_marker(path:str) -> bool:
+    """
+    Returns True if directory `path` holds a ``testmarker`` file, with a single ``os.stat()`` of the marker. Raises
+    FileNotFoundError if `path` itself does not exist; only a failed check pays for that second stat.
+    """
+
+    try:
+        os.stat(path + "testmarker")
+    except (FileNotFoundError, NotADirectoryError):
+        os.stat(path)
+        return False
+    return True
+
+def is_dataframe(_obj) -> bool:
+    """Returns True if _obj is a pandas DataFrame. Never imports pandas: if pandas has not been imported yet,
+    _obj cannot be a DataFrame."""
+
+    pandas = sys.modules.get("pandas")
+    if pandas is None:
+        return False
+
+    return type(_obj) == pandas.DataFrame
+
+# listener started by the last setup_logging(queue = True) call
+queue_listener = None
+
+def setup_logging(level:int = severity_level, queue:bool = False, handler:logging.Handler = None):
+    """Attaches a handler with the module FORMAT to the root logger and sets the module logger level.
+    Not done on import, so importing the module leaves the caller's logging setup untouched.
+
+    Arguments:
+        - `level`: level of the module logger. Calls below it only cost a level check, since every message
+        is formatted lazily.
+        - `queue`: if True, records of the module logger are put on a queue and written by a
+        ``logging.handlers.QueueListener`` thread, so the calling thread never waits for log I/O.
+        - `handler`: handler used by the listener when `queue` is True. Defaults to a ``StreamHandler``.
+
+    Returns the started QueueListener when `queue` is True (call its ``stop()`` to flush and stop it) and None otherwise.
+    Calling it again with `queue` True replaces the previous queue handler and stops its listener, so handlers never
+    stack up on the module logger.
+    """
+    global queue_listener
+
+    logger.setLevel(level)
+
+    if not queue:
+        logging.basicConfig(format=FORMAT)
+        return None
+
+    from logging.handlers import QueueHandler, QueueListener
+    import queue as queue_module
+
+    for module_handler in list(logger.handlers):
+        if isinstance(module_handler, QueueHandler):
+            logger.removeHandler(module_handler)
+    if queue_listener is not None:
+        try:
+            queue_listener.stop()
+        except AttributeError:
+            # the caller already stopped it
+            pass
+
+    if handler is None:
+        handler = logging.StreamHandler()
+    if handler.formatter is None:
+        handler.setFormatter(logging.Formatter(FORMAT))
+
+    log_queue = queue_module.SimpleQueue()
+    queue_listener = QueueListener(log_queue, handler, respect_handler_level = True)
+
+    logger.addHandler(QueueHandler(log_queue))
+    logger.propagate = False
+    queue_listener.start()
+
+    return queue_listener
+
 def list_of_keys(_dict:dict) -> list:
     """Creates a list with the keys from _dict"""
     _list = []
@@ -675,6 +1997,406 @@ def row_processing(x:Union[str,int,float]) -> str :
         return int(x)
     return str(x)
 
+def column_processing(column) -> list:
+    """
+    Vectorized version of ``row_processing()`` for a whole column. Gives the same values as calling
+    ``row_processing()`` on every cell, but works out the conversion once per column.
+
+    column: NumPy array with the column values. Bool, integer and float arrays are converted with
+    NumPy operations; any other array is processed cell by cell.
+    """
+
+    kind = column.dtype.kind
+
+    if kind == 'b':
+        return np.where(column, '1', '0').tolist()
+    if kind in 'iu':
+        return list(map(str, column.tolist()))
+    if kind == 'f' and column.dtype.itemsize <= 8:
+        # cells are read as python floats, so narrower floats must be widened before formatting
+        column = column.astype(np.float64, copy=False)
+        integral = np.isfinite(column) & (np.trunc(column) == column)
+        if not integral.any():
+            return list(map(str, column.tolist()))
+
+        processed = np.empty(len(column), dtype=object)
+        processed[~integral] = list(map(str, column[~integral].tolist()))
+        fits_int64 = integral & (np.abs(column) < 2**63)
+        processed[fits_int64] = column[fits_int64].astype(np.int64)
+        too_large = integral & ~fits_int64
+        if too_large.any():
+            processed[too_large] = [int(x) for x in column[too_large].tolist()]
+        return processed.tolist()
+
+    return [row_processing(x) for x in column]
+
+def processed_columns(df:DataFrame) -> list:
+    """
+    Applies the ``row_processing()`` rules to every column of df. Returns a list with one list of values per column.
+
+    Values are typed exactly as ``DataFrame.iterrows()`` would hand them over: if every column is numeric the
+    row dtype is shared by all columns (ints become floats next to a float column), otherwise every column
+    keeps its own dtype.
+    """
+
+    dtypes = list(df.dtypes)
+    numeric = [isinstance(dtype, np.dtype) and dtype.kind in 'iuf' for dtype in dtypes]
+
+    if dtypes and all(numeric):
+        values = df.to_numpy()
+        return [column_processing(values[:, position]) for position in range(values.shape[1])]
+
+    columns = []
+    for position, dtype in enumerate(dtypes):
+        column = df.iloc[:, position]
+        if isinstance(dtype, np.dtype) and dtype.kind in 'biuf':
+            columns.append(column_processing(column.to_numpy()))
+        else:
+            columns.append([row_processing(x) for x in column])
+
+    return columns
+
+def typed_value(x):
+    """
+    Typed counterpart of ``row_processing()``. Keeps x as a native Python value instead of a string, applying the
+    same NULL and bool rules: '[NULL]' becomes None, as do NaN, NA and NaT, and bools become 1 or 0. NumPy scalars
+    are turned into the matching Python value.
+    """
+
+    if type(x) == str:
+        return None if x == '[NULL]' else x
+    if isinstance(x, np.generic):
+        x = x.item()
+    if type(x) == bool:
+        return 1 if x else 0
+    if x is None or x is pd.NA or x is pd.NaT:
+        return None
+    if isinstance(x, float) and x != x:
+        return None
+    return x
+
+def typed_column(column) -> list:
+    """
+    Vectorized version of ``typed_value()`` for a whole column, given as a NumPy array. Bool, integer and float
+    arrays are converted with NumPy operations; any other array is processed cell by cell.
+    """
+
+    kind = column.dtype.kind
+
+    if kind == 'b':
+        return column.astype(np.uint8).tolist()
+    if kind in 'iu':
+        return column.tolist()
+    if kind == 'f':
+        values = column.tolist()
+        for position in np.flatnonzero(np.isnan(column)).tolist():
+            values[position] = None
+        return values
+
+    return typed_objects(column.tolist())
+
+def typed_objects(values:list) -> list:
+    """
+    Applies ``typed_value()`` to a list of cells. Plain strings, the most common object cells, are kept without
+    a function call.
+    """
+
+    return [x if type(x) == str and x != '[NULL]' else typed_value(x) for x in values]
+
+def typed_columns(df:DataFrame) -> list:
+    """
+    Applies the ``typed_value()`` rules to every column of df. Returns a list with one list of values per column.
+    Unlike ``processed_columns()``, every column keeps its own dtype.
+    """
+
+    columns = []
+    for position, dtype in enumerate(df.dtypes):
+        column = df.iloc[:, position]
+        if isinstance(dtype, np.dtype) and dtype.kind in 'biuf':
+            columns.append(typed_column(column.to_numpy()))
+        else:
+            columns.append(typed_objects(column.tolist()))
+
+    return columns
+
+def typed_arrays(df:DataFrame) -> list:
+    """
+    NumPy version of ``typed_columns()``. Bool columns become uint8 arrays of 1/0 and numeric columns without NULLs
+    keep their dtype; every other column becomes an object array of typed values with None for every NULL.
+    """
+
+    arrays = []
+    for position, dtype in enumerate(df.dtypes):
+        column = df.iloc[:, position]
+        if isinstance(dtype, np.dtype) and dtype.kind == 'b':
+            arrays.append(column.to_numpy().astype(np.uint8))
+            continue
+        if isinstance(dtype, np.dtype) and dtype.kind in 'iu':
+            arrays.append(column.to_numpy())
+            continue
+        if isinstance(dtype, np.dtype) and dtype.kind == 'f':
+            values = column.to_numpy()
+            if not np.isnan(values).any():
+                arrays.append(values)
+                continue
+
+        array = np.empty(len(column), dtype=object)
+        array[:] = typed_column(column.to_numpy()) if isinstance(dtype, np.dtype) and dtype.kind == 'f' else typed_objects(column.tolist())
+        arrays.append(array)
+
+    return arrays
+
+def sqlite_identifier(name) -> str:
+    """Returns `name` as a quoted SQLite identifier."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+def sqlite_value(x):
+    """
+    Turns a ``typed_value()`` result that SQLite cannot bind into one it can: datetimes (Timestamps included),
+    dates and times become ISO 8601 strings, timedeltas and Decimals become strings, so no precision is lost.
+    Every other value is returned as it is.
+    """
+
+    if isinstance(x, datetime.datetime):
+        return x.isoformat(sep = " ")
+    if isinstance(x, (datetime.date, datetime.time)):
+        return x.isoformat()
+    if isinstance(x, (datetime.timedelta, decimal.Decimal)):
+        return str(x)
+    return x
+
+def sqlite_row(row:tuple, positions:list) -> tuple:
+    """Returns `row` with ``sqlite_value()`` applied to the values at `positions`."""
+
+    row = list(row)
+    for position in positions:
+        row[position] = sqlite_value(row[position])
+    return tuple(row)
+
+def sql_value(x) -> str:
+    """
+    Turns x into a literal for the VALUES clause of an INSERT INTO statement, following the rules of
+    ``DataFormatting.value_string()``: bools become bits, strings with 36 characters are cast to uniqueidentifier
+    and 'True'/'False' strings become bits. None becomes NULL and ints and floats are written as they are. Every other
+    value, such as other strings, dates or decimals, is written as a quoted and escaped string.
+    """
+
+    if x is None:
+        return 'NULL'
+    if isinstance(x, np.generic):
+        x = x.item()
+    if type(x) == bool:
+        return '1' if x else '0'
+    if type(x) == str:
+        if len(x) == 36:
+            return "CAST('" + x.replace("'", "''") + "' AS uniqueidentifier)"
+        if x == 'False': return '0'
+        if x == 'True': return '1'
+    elif isinstance(x, (int, float)):
+        return str(x)
+    return "'" + str(x).replace("'", "''") + "'"
+
+def sql_parameter(x, placeholder:str = "?") -> tuple:
+    """
+    Parameterized counterpart of ``sql_value()``. Returns a ``(fragment, value)`` tuple, where fragment is the
+    placeholder to be put in the statement and value is the parameter to be bound to it.
+    """
+
+    if type(x) == bool:
+        return placeholder, 1 if x else 0
+    if type(x) == str:
+        if len(x) == 36:
+            return f"CAST({placeholder} AS uniqueidentifier)", x
+        if x == 'False': return placeholder, 0
+        if x == 'True': return placeholder, 1
+    return placeholder, x
+
+def digit_tokens(values) -> tuple:
+    """
+    Returns ``(tokens, lengths)`` for a 1D array of non-negative integers: tokens is a uint8 array with one row per
+    value holding its ASCII digits, left aligned and padded with NUL bytes, and lengths holds the number of digits
+    of every value.
+    """
+
+    values = np.asarray(values, dtype=np.int64)
+
+    lengths = np.ones(values.shape, dtype=np.int64)
+    largest = int(values.max()) if values.size else 0
+    power = 10
+    while power <= largest:
+        lengths += values >= power
+        power *= 10
+
+    width = int(lengths.max()) if values.size else 1
+    tokens = np.zeros((values.size, width), dtype=np.uint8)
+    for position in range(width):
+        place = np.maximum(lengths - 1 - position, 0)
+        digit = ord("0") + (values // 10**place) % 10
+        tokens[:, position] = np.where(position < lengths, digit, 0)
+
+    return tokens, lengths
+
+def csv_block(matrix) -> bytes:
+    """
+    Formats a 2D array of non-negative integers as csv lines in a few NumPy operations. Every line is
+    preceded by a newline, matching the way ``ManageTestFiles`` appends lines after the header.
+
+    Every cell is laid out as a fixed width token (separator, digits and NUL padding) and the padding
+    is stripped from the whole block at once with ``bytes.translate()``.
+
+    matrix: 2D array with one row per csv line. Raises ValueError if it holds negative values.
+    """
+
+    matrix = np.asarray(matrix, dtype=np.int64)
+    if matrix.size == 0:
+        return b""
+
+    if int(matrix.min()) < 0:
+        raise ValueError("csv_block only formats non-negative integers")
+
+    largest = int(matrix.max())
+
+    if largest < 2**16:
+        # small values: one token per possible value, packed into a single integer so the gather is cheap
+        tokens, lengths = digit_tokens(np.arange(largest + 1))
+        width = 4 if tokens.shape[1] < 4 else 8
+        table = np.zeros((2, largest + 1, width), dtype=np.uint8)
+        table[:, :, 1:tokens.shape[1] + 1] = tokens
+        table[0, :, 0] = ord("\n")
+        table[1, :, 0] = ord(",")
+        packed = table.view(np.uint32 if width == 4 else np.uint64)[..., 0]
+
+        cells = packed[1][matrix]
+        cells[:, 0] = packed[0][matrix[:, 0]]
+    else:
+        tokens, lengths = digit_tokens(matrix.ravel())
+        cells = np.empty(matrix.shape + (tokens.shape[1] + 1,), dtype=np.uint8)
+        cells[..., 0] = ord(",")
+        cells[:, 0, 0] = ord("\n")
+        cells[..., 1:] = tokens.reshape(matrix.shape + (-1,))
+
+    return cells.tobytes().translate(None, b"\x00")
+
+def clone_file(source:str, destination:str, chunk_size:int = 1 << 30) -> str:
+    """
+    Copies `source` to `destination`, creating or overriding it, and returns the method used. The copy is made in
+    the kernel with ``os.copy_file_range()`` (which lets filesystems such as Btrfs or XFS share the data), then
+    ``os.sendfile()``, falling back to a buffered copy when neither is available or supported for these files.
+    """
+
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        size = os.fstat(src.fileno()).st_size
+
+        for method in ("copy_file_range", "sendfile"):
+            if not hasattr(os, method):
+                continue
+            copied = 0
+            try:
+                while copied < size:
+                    if method == "copy_file_range":
+                        step = os.copy_file_range(src.fileno(), dst.fileno(), min(chunk_size, size - copied), copied, copied)
+                    else:
+                        step = os.sendfile(dst.fileno(), src.fileno(), copied, min(chunk_size, size - copied))
+                    if step == 0:
+                        break
+                    copied += step
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EBADF):
+                    raise
+                logger.debug("%s not supported for %s: %s", method, destination, e)
+            if copied == size:
+                return method
+
+            # starting again from an empty destination
+            dst.seek(0)
+            dst.truncate()
+
+        src.seek(0)
+        shutil.copyfileobj(src, dst, 1 << 20)
+
+    return "buffered"
+
+def write_fully(f, data) -> None:
+    """Writes all of `data` to the unbuffered file `f`, repeating the write after a partial one."""
+    view = memoryview(data)
+    while view:
+        view = view[f.write(view):]
+
+def throughput_report(written:int, seconds:float, **fields) -> dict:
+    """Returns a report dict with `fields` plus the bytes written, the elapsed seconds and the throughput in MB/s."""
+
+    report = dict(fields)
+    report["bytes"] = written
+    report["seconds"] = seconds
+    report["mb_per_s"] = written / 1e6 / seconds if seconds else 0.0
+
+    return report
+
+def create_test_file(manager:ManageTestFiles, file_counter:int, seed = None) -> dict:
+    """
+    Process pool worker of ``ManageTestFiles.create_many()``. Receives a copy of the manager, verifies its test
+    area again and creates test file number `file_counter` in it.
+    """
+
+    path = manager.path
+    del manager.path
+    manager.set_path(path)
+    manager.safety_lock()
+
+    manager.multiple_files = False
+    manager.file_counter = file_counter
+
+    return manager.create_file(seed = seed)
+
+def creation_summary(outcomes:list, seconds:float) -> dict:
+    """
+    Builds the summary of ``ManageTestFiles.create_many()`` and ``acreate_many()`` from ``(file_counter, outcome)``
+    pairs, where the outcome is the report of the file, None or the exception raised while creating it.
+    """
+
+    files = []
+    failures = []
+    for file_counter, outcome in outcomes:
+        if outcome is None:
+            failures.append({"file_counter": file_counter, "error": "file was not created"})
+        elif isinstance(outcome, Exception):
+            failures.append({"file_counter": file_counter, "error": repr(outcome)})
+        else:
+            files.append(outcome)
+
+    summary = throughput_report(sum(report["bytes"] for report in files), seconds, files = files, failures = failures)
+    summary["files_per_s"] = len(files) / seconds if seconds else 0.0
+    logger.info("%s test files created in %.3fs, %s failures", len(files), seconds, len(failures))
+
+    return summary
+
+def remove_entries(entries:list) -> dict:
+    """
+    Worker of ``ManageTestFiles.clear_folder_parallel()``. Deletes every ``os.DirEntry`` in entries and returns
+    the number of files and directories removed, the bytes freed and the failures.
+    """
+
+    result = {"files": 0, "directories": 0, "bytes": 0, "failures": []}
+
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks = False):
+                for root, dir_names, file_names in os.walk(entry.path):
+                    for file_name in file_names:
+                        result["bytes"] += os.lstat(os.path.join(root, file_name)).st_size
+                    result["files"] += len(file_names)
+                shutil.rmtree(entry.path)
+                result["directories"] += 1
+            else:
+                size = entry.stat(follow_symlinks = False).st_size
+                os.unlink(entry.path)
+                result["files"] += 1
+                result["bytes"] += size
+        except OSError as e:
+            result["failures"].append({"path": entry.path, "error": repr(e)})
+
+    return result
+
 def correction_labels_to_list(reference):
     """Converts reference parameter to list in case it is a DataFrame.
 
@@ -687,17 +2409,18 @@ def correction_labels_to_list(reference):
     Returns a List as per reference argument discription.
     """
 
-    if type(reference) == DataFrame:
-        logger.debug(f'Correction object is a DataFrame. Extracting list of labels')
+    if is_dataframe(reference):
+        logger.debug('Correction object is a DataFrame. Extracting list of labels')
         df = reference
         reference = list(df.columns)
     elif type(reference) == tuple:
         reference = list(reference)
     else:
-        logger.debug(f'reference object is not a DataFrame. No changes made')
+        logger.debug('reference object is not a DataFrame. No changes made')
 
     return reference
 
 if __name__ == "__main__":
+    setup_logging()
     manager = ManageTestFiles("test_folder/")
     assert manager.create()
@@ -0,0 +1,197 @@
+"""Benchmarks for the utility_pack hot paths.
+
+Every benchmark runs at each of the requested input sizes and records its best wall time and its peak
+traced memory. Results can be saved as a baseline and later runs compared against it:
+
+    python benchmark_utility_pack.py --sizes 1000 10000 --save baseline.json
+    python benchmark_utility_pack.py --sizes 1000 10000 --compare baseline.json --threshold 0.25
+
+The comparison exits with status 1 if any benchmark is slower, or uses more memory, than its baseline
+by more than the threshold.
+"""
+
+import argparse, io, json, logging, platform, shutil, sys, tempfile, time, tracemalloc
+from utility_pack import CaseCorrection, DataFormatting, ManageTestCsvFiles, ManageTestFiles, print_rows
+import numpy as np
+import pandas as pd
+
+logging.getLogger("utility_pack").setLevel(logging.WARNING)
+
+DEFAULT_SIZES = [1000, 10000]
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.25
+
+# ----------------------------------------
+# Benchmarks
+#
+# Every benchmark receives the input size and a marked test directory, prepares its input and returns
+# the callable that is timed. ``max_size`` skips sizes a benchmark cannot handle in reasonable time.
+
+def labels(size:int, prefix:str) -> list:
+    return [f"{prefix}{number}" for number in range(size)]
+
+def correct_list(size:int, path:str):
+    _object = labels(size, "Label")
+    reference = labels(size, "label")
+    return lambda: CaseCorrection(_object).correct(reference, use_cache = False)
+
+def correct_list_cached(size:int, path:str):
+    _object = labels(size, "Label")
+    reference = labels(size, "label")
+    CaseCorrection(_object).correct(reference)
+    return lambda: CaseCorrection(_object).correct(reference)
+
+def correct_wide_dataframe(size:int, path:str):
+    df = pd.DataFrame(np.zeros((10, size)), columns = labels(size, "Label"))
+    reference = labels(size, "label")
+    return lambda: CaseCorrection(df.copy(deep = False)).correct(reference, use_cache = False)
+
+def mixed_dataframe(size:int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({"int": rng.integers(0, 1000, size),
+                         "float": rng.integers(0, 100, size) / 4,
+                         "bool": rng.random(size) > 0.5,
+                         "str": rng.choice(["a", "b", "[NULL]"], size)})
+
+def create_data_list(size:int, path:str):
+    formatter = DataFormatting(mixed_dataframe(size))
+    return formatter.create_data_list
+
+def create_insert_into_statement(size:int, path:str):
+    df = mixed_dataframe(size)
+    return lambda: DataFormatting.create_insert_into_statement(df)
+
+def create_insert_statements(size:int, path:str):
+    formatter = DataFormatting(mixed_dataframe(size))
+    return lambda: formatter.create_insert_statements("tbBenchmark")
+
+def to_sqlite(size:int, path:str):
+    formatter = DataFormatting(mixed_dataframe(size))
+    return lambda: formatter.to_sqlite(":memory:", "tbBenchmark")
+
+def create_csv(size:int, path:str):
+    manager = ManageTestCsvFiles(path, column_number = 9, line_number = size - 1)
+    return manager.create_csv
+
+def create_bulk_csv(size:int, path:str):
+    manager = ManageTestCsvFiles(path, column_number = 9, line_number = size - 1)
+    return lambda: manager.create_bulk_csv(seed = 0)
+
+def clear_folder(size:int, path:str):
+    manager = ManageTestFiles(path)
+
+    def run():
+        for number in range(size):
+            with open(f"{path}file{number}", "w") as f:
+                f.write("benchmark")
+        manager.clear_folder()
+
+    return run
+
+def print_rows_table(size:int, path:str):
+    rows = list(mixed_dataframe(size).itertuples(index = False))
+    return lambda: print_rows(rows, ["int", "float", "bool", "str"], out = io.StringIO())
+
+BENCHMARKS = {
+    "correct_list": {"setup": correct_list},
+    "correct_list_cached": {"setup": correct_list_cached},
+    "correct_wide_dataframe": {"setup": correct_wide_dataframe},
+    "create_data_list": {"setup": create_data_list},
+    "create_insert_into_statement": {"setup": create_insert_into_statement, "max_size": 2000},
+    "create_insert_statements": {"setup": create_insert_statements},
+    "to_sqlite": {"setup": to_sqlite},
+    "create_csv": {"setup": create_csv},
+    "create_bulk_csv": {"setup": create_bulk_csv},
+    "clear_folder": {"setup": clear_folder},
+    "print_rows": {"setup": print_rows_table},
+}
+
+# ----------------------------------------
+# Runner
+
+def measure(function, repeat:int) -> dict:
+    """Returns the best wall time of `repeat` runs of function and the peak memory traced in one extra run."""
+
+    seconds = []
+    for attempt in range(repeat):
+        start = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {"seconds": min(seconds), "peak_bytes": peak}
+
+def run_benchmarks(sizes:list, repeat:int = DEFAULT_REPEAT, names:list = None) -> dict:
+    """Runs the benchmarks in `names` (all of them by default) at every size. Returns a dict keyed by ``name@size``."""
+
+    path = tempfile.mkdtemp(prefix = "utility_pack_benchmark_") + "/"
+    with open(f"{path}testmarker", "w") as f:
+        f.write("")
+
+    results = {}
+    try:
+        for name, benchmark in BENCHMARKS.items():
+            if names and name not in names:
+                continue
+            for size in sizes:
+                if size > benchmark.get("max_size", size):
+                    continue
+                function = benchmark["setup"](size, path)
+                results[f"{name}@{size}"] = measure(function, repeat)
+                ManageTestFiles(path).clear_folder()
+    finally:
+        shutil.rmtree(path, ignore_errors = True)
+
+    return results
+
+def compare(results:dict, baseline:dict, threshold:float = DEFAULT_THRESHOLD) -> list:
+    """Returns a message for every result whose time or peak memory exceeds its baseline by more than `threshold`."""
+
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        for metric in ("seconds", "peak_bytes"):
+            if result[metric] > baseline[key][metric] * (1 + threshold):
+                regressions.append(f"{key} {metric}: {result[metric]:.6g} > baseline {baseline[key][metric]:.6g} (+{threshold:.0%})")
+
+    return regressions
+
+def main(argv:list = None) -> int:
+    parser = argparse.ArgumentParser(description = "Benchmarks for the utility_pack hot paths.")
+    parser.add_argument("--sizes", type = int, nargs = "+", default = DEFAULT_SIZES)
+    parser.add_argument("--repeat", type = int, default = DEFAULT_REPEAT)
+    parser.add_argument("--only", nargs = "+", choices = list(BENCHMARKS), help = "benchmarks to run")
+    parser.add_argument("--save", help = "file the results are saved to as a baseline")
+    parser.add_argument("--compare", help = "baseline file the results are compared against")
+    parser.add_argument("--threshold", type = float, default = DEFAULT_THRESHOLD, help = "allowed regression, as a fraction")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.repeat, args.only)
+
+    for key, result in results.items():
+        print(f"{key:40} {result['seconds']:12.6f} s {result['peak_bytes'] / 1e6:12.3f} MB")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"python": platform.python_version(), "results": results}, f, indent = 2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
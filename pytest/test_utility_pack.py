@@ -1,5 +1,6 @@
-import logging, os
-from utility_pack import ManageTestFiles, CaseCorrection
+import asyncio, logging, os, subprocess, sys, io
+import utility_pack
+from utility_pack import ManageTestFiles, ManageTestCsvFiles, CaseCorrection, ReferenceIndex, MapperCache, DataFormatting, ResultPrinter, row_processing, setup_logging, object_statistics, print_rows
 import pandas as pd
 
 severity_level = logging.WARNING
@@ -8,6 +9,9 @@ FORMAT = "[%(filename)s:%(lineno)s - %(funcName)20s() ] %(message)s"
 logging.basicConfig(format=FORMAT)
 logger.setLevel(severity_level)
 
+# cold start budget for ``import utility_pack``, in seconds
+IMPORT_TIME_BUDGET = 0.5
+
 def create_marker(path:str):
 
     if not path.endswith("/"):
@@ -95,6 +99,276 @@ class TestCaseCorrection():
 
         assert corrected_object.equals(pd.DataFrame({"tESTe":[1,2,3,6,2], "abiLIDebob":[4,5,6,6,11]}))
 
+    def test_mapper_matches_pairwise_comparison(self):
+
+        test_object = ["tEste", "Teste", "abc", "ABC", "other"]
+        reference_object = ["teste", "Teste", "abC", "nothing"]
+
+        expected = {}
+        for key in test_object:
+            for value in reference_object:
+                if key.lower() == value.lower() and key != value:
+                    expected[key] = value
+
+        test = CaseCorrection(test_object)
+
+        assert test.create_mapper(reference_object) == expected
+
+    def test_reference_index_reports_ambiguous_labels(self):
+
+        index = ReferenceIndex(["Teste", "TESTE", "abc"])
+
+        assert index.ambiguous == {"teste": ["Teste", "TESTE"]}
+        assert index.lookup("teste") == "TESTE"
+        assert index.lookup("abc") == None
+
+    def test_DataFrame_case_correction_without_inplace(self):
+
+        test_object = pd.DataFrame({"tEste":[1,2,3], "abilidebob":[4,5,6]})
+        reference_object = ["Teste"]
+
+        corrected_object = CaseCorrection(test_object).correct(reference_object, inplace = False)
+
+        assert list(corrected_object.columns) == ["Teste", "abilidebob"]
+        assert list(test_object.columns) == ["tEste", "abilidebob"]
+        assert corrected_object.equals(pd.DataFrame({"Teste":[1,2,3], "abilidebob":[4,5,6]}))
+
+    def test_DataFrame_case_correction_with_categorical_columns(self):
+
+        test_object = pd.DataFrame([[1, 2]], columns = pd.CategoricalIndex(["tEste", "b"]))
+
+        corrected_object = CaseCorrection(test_object).correct(["Teste"], use_cache = False)
+
+        assert list(corrected_object.columns) == ["Teste", "b"]
+        assert corrected_object.iloc[0].tolist() == [1, 2]
+
+    def test_mapper_cache_counts_hits_misses_and_evictions(self):
+
+        cache = MapperCache(maxsize = 2)
+
+        assert cache.mapper(["tEste"], ["Teste"]) == {"tEste": "Teste"}
+        assert cache.mapper(["tEste"], ["Teste"]) == {"tEste": "Teste"}
+        cache.mapper(["abc"], ["ABC"])
+        cache.mapper(["xyz"], ["XYZ"])
+
+        assert cache.stats() == {"hits": 1, "misses": 3, "evictions": 1, "size": 2, "maxsize": 2}
+
+        test = CaseCorrection(["tEste"])
+        test.create_mapper(["Teste"], cache = cache)
+
+        assert cache.misses == 4
+
+    def test_cache_hits_warn_about_ambiguous_reference(self, caplog):
+
+        cache = MapperCache()
+
+        with caplog.at_level(logging.WARNING, logger = "utility_pack"):
+            for attempt in range(2):
+                CaseCorrection(["tEste"]).create_mapper(["Teste", "TESTE"], cache = cache)
+
+        warnings = [record for record in caplog.records if "ambiguous reference labels found" in record.getMessage()]
+        assert cache.hits == 1
+        assert len(warnings) == 2
+
+    def test_correct_many_against_one_reference(self):
+
+        objects = [["tEste", "other"], ("abC",), pd.DataFrame({"tESTE":[1], "abc":[2]})]
+        reference_object = ["Teste", "ABC"]
+
+        for workers in (None, 2):
+            corrected_objects, stats = CaseCorrection.correct_many(objects[:2] + [objects[2].copy()], reference_object, workers = workers)
+
+            assert corrected_objects[0] == ["Teste", "other"]
+            assert corrected_objects[1] == ["ABC"]
+            assert list(corrected_objects[2].columns) == ["Teste", "ABC"]
+            assert [(stat["labels"], stat["renamed"]) for stat in stats] == [(2, 1), (1, 1), (2, 2)]
+
+class TestObjectStatistics():
+
+    def test_dataframe_statistics(self):
+
+        test_object = pd.DataFrame({"int":[1,2,2,3], "float":[1.5,None,None,2.0], "str":["a","b","a","a"]})
+
+        statistics = object_statistics(test_object)
+
+        assert statistics["rows"] == 4
+        assert statistics["sampled"] == 4
+        assert statistics["column_statistics"]["int"]["distinct_estimate"] == 3
+        assert statistics["column_statistics"]["float"]["null_ratio"] == 0.5
+        assert statistics["column_statistics"]["str"]["distinct_estimate"] == 2
+        assert statistics["memory_bytes"] > 0
+
+    def test_list_statistics_are_sampled(self):
+
+        test_object = [number % 10 for number in range(100000)] + [None] * 10
+
+        statistics = object_statistics(test_object, sample_size = 1000)
+
+        assert statistics["length"] == 100010
+        assert statistics["sampled"] == 1000
+        assert statistics["distinct_estimate"] == 10
+
+class TestDataFormatting():
+
+    def test_create_data_list_matches_row_processing(self):
+
+        test_object = pd.DataFrame({"int":[1,2,3], "float":[1.0,2.5,3.0], "bool":[True,False,True], "str":["a","[NULL]","c"]})
+        numeric_object = pd.DataFrame({"int":[1,2,3], "float":[1.0,2.5,3.0]})
+
+        for df in (test_object, numeric_object):
+            expected = [tuple([row_processing(x) for x in row]) for index, row in df.iterrows()]
+            data_list = DataFormatting(df).create_data_list()
+
+            assert data_list == expected
+            assert [[type(x) for x in row] for row in data_list] == [[type(x) for x in row] for row in expected]
+
+    def test_iter_data_batches_yields_bounded_batches(self):
+
+        test_object = pd.DataFrame({"int":range(10), "bool":[True,False]*5})
+        formatter = DataFormatting(test_object)
+
+        batches = list(formatter.iter_data_batches(batch_size = 4))
+
+        assert [len(batch) for batch in batches] == [4, 4, 2]
+        assert [row for batch in batches for row in batch] == formatter.create_data_list()
+
+    def test_typed_output_keeps_native_values(self):
+
+        test_object = pd.DataFrame({"int":[1,2,3], "float":[1.0,float("nan"),2.5], "bool":[True,False,True],
+                                    "str":["a","[NULL]",None], "bytes":[b"x",b"",b"z"]})
+        formatter = DataFormatting(test_object)
+
+        data_list = formatter.create_data_list(typed = True)
+
+        assert data_list == [(1, 1.0, 1, "a", b"x"), (2, None, 0, None, b""), (3, 2.5, 1, None, b"z")]
+        assert [type(x) for x in data_list[0]] == [int, float, int, str, bytes]
+        assert [row for batch in formatter.iter_data_batches(batch_size = 2, typed = True) for row in batch] == data_list
+        assert formatter.create_columns() == [list(column) for column in zip(*data_list)]
+
+    def test_create_columns_as_arrays(self):
+
+        test_object = pd.DataFrame({"int":[1,2], "float":[0.5,1.5], "nan":[0.5,float("nan")], "bool":[True,False], "str":["a","[NULL]"]})
+
+        arrays = DataFormatting(test_object).create_columns(arrays = True)
+
+        assert [array.dtype.kind for array in arrays] == ["i", "f", "O", "u", "O"]
+        assert arrays[3].tolist() == [1, 0]
+        assert arrays[2].tolist() == [0.5, None]
+        assert arrays[4].tolist() == ["a", None]
+
+    def test_to_sqlite_loads_rows_in_transactions(self):
+
+        import sqlite3
+
+        test_object = pd.DataFrame({"int":range(10), "bool":[True,False]*5, "str":["a","[NULL]"]*5})
+        connection = sqlite3.connect(":memory:")
+
+        report = DataFormatting(test_object).to_sqlite(connection, "tbTest", batch_size = 3, transaction_size = 6, typed = True)
+        rows = connection.execute('SELECT "int", "bool", "str" FROM tbTest ORDER BY "int"').fetchall()
+
+        assert report["rows"] == 10
+        assert report["batches"] == 4
+        assert report["transactions"] == 2
+        assert report["rows_per_s"] > 0
+        assert rows == DataFormatting(test_object).create_data_list(typed = True)
+
+    def test_to_sqlite_binds_datetimes_and_decimals(self):
+
+        import sqlite3, decimal
+
+        test_object = pd.DataFrame({"when":pd.to_datetime(["2024-01-02 03:04:05", None]), "amount":[decimal.Decimal("1.50"), None]})
+        connection = sqlite3.connect(":memory:")
+
+        report = DataFormatting(test_object).to_sqlite(connection, "tbTest", typed = True)
+        rows = connection.execute('SELECT "when", "amount" FROM tbTest').fetchall()
+
+        assert report["rows"] == 2
+        assert rows == [("2024-01-02 03:04:05", "1.50"), (None, None)]
+
+    def test_to_sqlite_restores_pragmas_of_caller_connection(self):
+
+        import sqlite3
+
+        connection = sqlite3.connect(":memory:")
+        before = [connection.execute(f"PRAGMA {name}").fetchone()[0] for name in ("synchronous", "temp_store", "cache_size")]
+
+        DataFormatting(pd.DataFrame({"id":[1,2]})).to_sqlite(connection, "tbTest")
+
+        after = [connection.execute(f"PRAGMA {name}").fetchone()[0] for name in ("synchronous", "temp_store", "cache_size")]
+        assert after == before
+        assert "journal_mode" not in DataFormatting.sqlite_pragmas
+
+    def test_to_sqlite_rolls_back_failed_transaction(self):
+
+        import sqlite3
+
+        test_object = pd.DataFrame({"id":[1,2,3,3]})
+        connection = sqlite3.connect(":memory:")
+        connection.execute("CREATE TABLE tbTest (id INTEGER PRIMARY KEY)")
+
+        try:
+            DataFormatting(test_object).to_sqlite(connection, "tbTest", batch_size = 2, transaction_size = 2, pragmas = {})
+            raise AssertionError("duplicate key was loaded")
+        except sqlite3.IntegrityError:
+            pass
+
+        assert connection.execute("SELECT id FROM tbTest").fetchall() == [(1,), (2,)]
+
+    def test_to_sqlite_leaves_caller_transaction_alone(self):
+
+        import sqlite3
+
+        connection = sqlite3.connect(":memory:")
+        connection.execute("CREATE TABLE tbCaller (id INTEGER)")
+        connection.execute("CREATE TABLE tbTest (id INTEGER PRIMARY KEY)")
+        connection.commit()
+        connection.execute("INSERT INTO tbCaller VALUES (1)")
+
+        report = DataFormatting(pd.DataFrame({"id":[1,2]})).to_sqlite(connection, "tbTest", batch_size = 1, transaction_size = 1)
+
+        assert report["rows"] == 2
+        assert report["transactions"] == 0
+        assert connection.in_transaction
+
+        try:
+            DataFormatting(pd.DataFrame({"id":[3,3]})).to_sqlite(connection, "tbTest")
+            raise AssertionError("duplicate key was loaded")
+        except sqlite3.IntegrityError:
+            pass
+
+        assert connection.in_transaction
+        assert connection.execute("SELECT id FROM tbTest").fetchall() == [(1,), (2,)]
+        assert connection.execute("SELECT id FROM tbCaller").fetchall() == [(1,)]
+
+        connection.rollback()
+
+        assert connection.execute("SELECT id FROM tbTest").fetchall() == []
+        assert connection.execute("SELECT id FROM tbCaller").fetchall() == []
+
+    def test_create_insert_statements_batches_rows(self):
+
+        uid = "12345678-1234-1234-1234-123456789012"
+        test_object = pd.DataFrame({"id":[uid, uid, uid], "flag":[True,False,True], "name":["it's", None, "True"]})
+        formatter = DataFormatting(test_object)
+
+        sql = formatter.create_insert_statements("tbTest", batch_size = 2)
+
+        assert sql.split("\n") == [
+            f"INSERT INTO tbTest (id, flag, name) VALUES (CAST('{uid}' AS uniqueidentifier), 1, 'it''s'), (CAST('{uid}' AS uniqueidentifier), 0, NULL);",
+            f"INSERT INTO tbTest (id, flag, name) VALUES (CAST('{uid}' AS uniqueidentifier), 1, 1);"]
+
+        statement, params = next(formatter.iter_insert_statements("tbTest", batch_size = 1, parameterized = True))
+
+        assert statement == "INSERT INTO tbTest (id, flag, name) VALUES (CAST(? AS uniqueidentifier), ?, ?);"
+        assert params == [uid, 1, "it's"]
+
+        quoted_uid = "a" * 35 + "'"
+        test_object = pd.DataFrame({"id":[quoted_uid], "day":pd.to_datetime(["2020-01-01"]), "count":[2], "ratio":[0.5]})
+        sql = DataFormatting(test_object).create_insert_statements("tbTest")
+
+        assert sql == ("INSERT INTO tbTest (id, day, count, ratio) VALUES "
+                       "(CAST('" + "a" * 35 + "''' AS uniqueidentifier), '2020-01-01 00:00:00', 2, 0.5);")
+
 class TestBaseManager():
 
     def test_create_in_unmarked_directory(self):
@@ -127,6 +401,39 @@ class TestBaseManager():
 
         assert manager.create() == True
 
+    def test_create_writes_lines_from_generator(self):
+
+        path = "test_folder/"
+
+        create_marker(path)
+
+        manager = ManageTestFiles(path, header = "header")
+        manager.create(lines = (f"line {number}" for number in range(3)))
+
+        with open(manager.file_name()) as f:
+            content = f.read()
+        manager.clear_folder()
+
+        assert content == "header\nline 0\nline 1\nline 2"
+        assert not hasattr(manager, "line_list")
+
+    def test_preview_test_file_returns_head_tail_and_counts(self):
+
+        path = "test_folder/"
+
+        create_marker(path)
+
+        manager = ManageTestFiles(path, header = "header")
+        manager.create(lines = (f"line {number}" for number in range(100)))
+        preview = manager.preview_test_file(lines = 2)
+        size = os.path.getsize(manager.file_name())
+        manager.clear_folder()
+
+        assert preview["head"] == ["header", "line 0"]
+        assert preview["tail"] == ["line 98", "line 99"]
+        assert preview["line_count"] == 101
+        assert preview["size"] == size
+
     def test_clear_unmarked_folder(self):
 
         path = "test_folder/"
@@ -158,5 +465,534 @@ class TestBaseManager():
 
         assert check_for_marker(path) == True
 
+    def test_clear_folder_parallel_reports_removed_files(self):
+
+        path = "test_folder/"
+
+        create_marker(path)
+
+        for number in range(5):
+            with open(f"{path}file{number}", "w") as f:
+                f.write("12345")
+        os.makedirs(f"{path}subfolder")
+        with open(f"{path}subfolder/inner", "w") as f:
+            f.write("123")
+
+        manager = ManageTestFiles(path)
+        summary = manager.clear_folder_parallel(workers = 3)
+
+        assert summary["files"] == 6
+        assert summary["directories"] == 1
+        assert summary["bytes"] == 28
+        assert summary["failures"] == []
+        assert os.listdir(path) == ["testmarker"]
+
+    def test_setup_does_not_list_directory(self, monkeypatch):
+
+        path = "test_folder/"
+
+        create_marker(path)
+
+        def listdir(path):
+            raise AssertionError("directory listed")
+
+        monkeypatch.setattr(os, "listdir", listdir)
+        manager = ManageTestFiles(path)
+
+        assert manager.path == path
+        assert utility_pack.has_marker(path) == True
+
+    def test_removed_marker_engages_safety_lock(self):
+
+        path = "test_folder/"
+
+        create_marker(path)
+
+        manager = ManageTestFiles(path)
+        remove_marker(path)
+
+        try:
+            assert manager.create() == False
+            assert utility_pack.has_marker(path) == False
+        finally:
+            create_marker(path)
+
+        assert manager.create() == True
+
+    def test_compressed_create_streams_lines(self):
+
+        import lzma
+
+        path = "test_folder/"
+
+        create_marker(path)
+
+        manager = ManageTestFiles(path, compression = "xz", compression_level = 0)
+        report = manager.create_file()
+
+        with lzma.open(manager.file_name(), "rt") as f:
+            content = f.read()
+
+        assert content == manager.header + "".join("\n" + line for line in manager.standard_lines())
+        assert report["bytes"] == len(content.encode())
+        assert report["compressed_bytes"] == os.path.getsize(manager.file_name())
+        manager.clear_folder()
+
+    def test_create_sized_writes_exact_size(self):
+
+        path = "test_folder/"
+
+        create_marker(path)
+
+        manager = ManageTestFiles(path)
+        report = manager.create_sized(10000, chunk_size = 4096)
+        with open(manager.file_name(), "rb") as f:
+            content = f.read()
+
+        template = manager.sized_template(4096)
+        assert report["bytes"] == len(content) == 10000
+        assert content.startswith(manager.header.encode() + template)
+        assert content[len(manager.header):] == (template * (10000 // len(template) + 1))[:10000 - len(manager.header)]
+        assert ManageTestFiles(path, compression = "gzip").create_sized(100) is None
+        manager.clear_folder()
+
+    def test_create_clones_copies_first_file(self):
+
+        path = "test_folder/"
+
+        create_marker(path)
+
+        manager = ManageTestFiles(path, multiple_files = True, line_number = 1000)
+        summary = manager.create_clones(4)
+
+        contents = []
+        for file in summary["files"]:
+            with open(file, "rb") as f:
+                contents.append(f.read())
+
+        assert [os.path.basename(file) for file in summary["files"]] == [f"demofile{number}.csv" for number in range(1, 5)]
+        assert manager.file_counter == 4
+        assert len(set(contents)) == 1
+        assert summary["bytes"] == 4 * len(contents[0])
+        assert sum(summary["methods"].values()) == 3
+        assert ManageTestFiles(path).create_clones(2) is None
+        manager.clear_folder()
+
+    def test_clone_file_falls_back(self, monkeypatch):
+
+        import errno
+
+        path = "test_folder/"
+
+        create_marker(path)
+
+        source = f"{path}clone_source"
+        with open(source, "wb") as f:
+            f.write(os.urandom(100000))
+
+        def unsupported(*args):
+            raise OSError(errno.EXDEV, "cross-device link")
+
+        expected = []
+        for method in ("copy_file_range", "sendfile"):
+            if hasattr(os, method):
+                monkeypatch.setattr(os, method, unsupported)
+            expected.append(utility_pack.clone_file(source, f"{path}clone_{method}"))
+            with open(source, "rb") as original, open(f"{path}clone_{method}", "rb") as copy:
+                assert original.read() == copy.read()
+
+        assert expected[0] == ("sendfile" if hasattr(os, "sendfile") else "buffered")
+        assert expected[-1] == "buffered"
+        ManageTestFiles(path).clear_folder()
+
+    def test_unknown_compression_is_rejected(self):
+
+        try:
+            ManageTestFiles("test_folder/", compression = "zip")
+            raise AssertionError("unknown compression accepted")
+        except ValueError:
+            pass
+
+    def test_async_create_and_clear(self):
+
+        path = "test_folder/"
+
+        create_marker(path)
+
+        manager = ManageTestFiles(path)
+
+        assert asyncio.run(manager.acreate()) == True
+        assert os.path.exists(manager.file_name())
+        assert asyncio.run(manager.aclear_folder()) == True
+        assert not os.path.exists(manager.file_name())
+        assert check_for_marker(path) == True
+
+    def test_async_create_in_unmarked_directory(self):
+
+        path = "test_folder/"
+
+        remove_marker(path)
+
+        manager = ManageTestFiles(path)
+
+        try:
+            assert asyncio.run(manager.acreate()) == False
+            assert asyncio.run(manager.aclear_folder()) == False
+        finally:
+            create_marker(path)
+
+class TestImport():
+
+    def test_import_is_lazy_and_within_budget(self):
+
+        code = """
+import sys, time
+start = time.perf_counter()
+import utility_pack
+print(time.perf_counter() - start)
+print(','.join(module for module in ('pandas', 'numpy', 'prettytable', 'colorama') if module in sys.modules))
+"""
+        env = dict(os.environ, PYTHONPATH = os.path.dirname(os.path.abspath(utility_pack.__file__)))
+        result = subprocess.run([sys.executable, "-c", code], capture_output = True, text = True, env = env, check = True)
+        import_time, loaded_modules = result.stdout.split("\n")[:2]
+
+        assert loaded_modules == ""
+        assert float(import_time) < IMPORT_TIME_BUDGET
+
+    def test_list_correction_does_not_need_pandas(self):
+
+        code = """
+import sys, utility_pack
+assert utility_pack.CaseCorrection(["tEste"]).correct(["Teste"]) == ["Teste"]
+assert utility_pack.row_processing(True) == '1'
+print('pandas' in sys.modules)
+"""
+        env = dict(os.environ, PYTHONPATH = os.path.dirname(os.path.abspath(utility_pack.__file__)))
+        result = subprocess.run([sys.executable, "-c", code], capture_output = True, text = True, env = env, check = True)
+
+        assert result.stdout.strip() == "False"
+
+class TestCsvManager():
+
+    def test_csv_manager_creates_csv_file(self):
+
+        path = "test_folder/"
+
+        create_marker(path)
+
+        manager = ManageTestCsvFiles(path, column_number = 2, line_number = 4)
+        manager.create_csv()
+
+        with open(manager.file_name()) as f:
+            lines = f.read().split("\n")
+        manager.clear_folder()
+
+        assert lines[0] == "col0,col1,col2"
+        assert len(lines) == 6
+        assert all(len(line.split(",")) == 3 for line in lines[1:])
+
+    def test_bulk_csv_is_reproducible_with_seed(self):
+
+        path = "test_folder/"
+
+        create_marker(path)
+
+        manager = ManageTestCsvFiles(path, column_number = 4, line_number = 999)
+
+        contents = []
+        for attempt in range(2):
+            report = manager.create_bulk_csv(seed = 42, block_lines = 300)
+            with open(report["file"]) as f:
+                contents.append(f.read())
+        manager.clear_folder()
+
+        lines = contents[0].split("\n")
+
+        assert contents[0] == contents[1]
+        assert report["lines"] == 1000
+        assert report["bytes"] == len(contents[0])
+        assert lines[0] == "col0,col1,col2,col3,col4"
+        assert len(lines) == 1001
+        assert all(1 <= int(value) <= 20 for line in lines[1:] for value in line.split(","))
+
+    def test_create_many_is_deterministic_per_file(self):
+
+        path = "test_folder/"
+
+        create_marker(path)
+
+        contents = []
+        for attempt in range(2):
+            manager = ManageTestCsvFiles(path, column_number = 3, line_number = 50)
+            summary = manager.create_many(4, processes = 2, seed = 7)
+            files = sorted(report["file"] for report in summary["files"])
+            contents.append([open(file).read() for file in files])
+            manager.clear_folder()
+
+        assert summary["failures"] == []
+        assert [os.path.basename(file) for file in files] == [f"demofile{number}.csv" for number in range(1, 5)]
+        assert manager.file_counter == 4
+        assert contents[0] == contents[1]
+        assert len(set(contents[0])) == 4
+
+    def test_bulk_csv_rejects_negative_range(self):
+
+        path = "test_folder/"
+
+        create_marker(path)
+
+        manager = ManageTestCsvFiles(path, column_number = 2, line_number = 10)
+        manager.clear_folder()
+
+        assert manager.create_bulk_csv(low = -1, high = 3) is None
+        assert manager.create_bulk_csv(low = 5, high = 4) is None
+        assert not os.path.exists(manager.file_name())
+        try:
+            utility_pack.csv_block([[1, -1]])
+            raise AssertionError("negative value formatted")
+        except ValueError:
+            pass
+
+    def test_compressed_bulk_csv_matches_uncompressed(self):
+
+        import gzip, bz2, lzma
+
+        path = "test_folder/"
+
+        create_marker(path)
+
+        manager = ManageTestCsvFiles(path, column_number = 4, line_number = 999)
+        report = manager.create_bulk_csv(seed = 3)
+        with open(manager.file_name(), "rb") as f:
+            content = f.read()
+
+        for compression, codec in (("gzip", gzip), ("bz2", bz2), ("xz", lzma)):
+            manager = ManageTestCsvFiles(path, column_number = 4, line_number = 999, compression = compression)
+            compressed_report = manager.create_bulk_csv(seed = 3)
+
+            assert manager.file_name().endswith(".csv." + ManageTestCsvFiles.compressions[compression][0])
+            assert compressed_report["bytes"] == report["bytes"]
+            assert compressed_report["compressed_bytes"] == os.path.getsize(manager.file_name()) < report["bytes"]
+            with codec.open(manager.file_name(), "rb") as f:
+                assert f.read() == content
+
+        assert manager.preview_test_file() is None
+        manager.clear_folder()
+
+    def test_create_sized_csv(self):
+
+        path = "test_folder/"
+
+        create_marker(path)
+
+        manager = ManageTestCsvFiles(path, column_number = 4)
+        report = manager.create_sized(3 << 20, chunk_size = 1 << 20, seed = 1)
+
+        with open(manager.file_name()) as f:
+            lines = f.read().splitlines()
+
+        assert report["bytes"] == os.path.getsize(manager.file_name()) == 3 << 20
+        assert lines[0] == "col0,col1,col2,col3,col4"
+        assert all(len(line.split(",")) == 5 for line in lines[1:-1])
+        manager.clear_folder()
+
+    def test_acreate_many_matches_create_many(self):
+
+        path = "test_folder/"
+
+        create_marker(path)
+
+        contents = []
+        for create in ("create_many", "acreate_many"):
+            manager = ManageTestCsvFiles(path, column_number = 3, line_number = 50)
+            if create == "create_many":
+                summary = manager.create_many(4, processes = 2, seed = 7)
+            else:
+                summary = asyncio.run(manager.acreate_many(4, concurrency = 2, seed = 7))
+            files = sorted(report["file"] for report in summary["files"])
+            contents.append([open(file).read() for file in files])
+            manager.clear_folder()
+
+        assert summary["failures"] == []
+        assert manager.file_counter == 4
+        assert contents[0] == contents[1]
+
+class CountingReference(list):
+    """List that counts how many times it is formatted."""
+
+    format_count = 0
+
+    def __repr__(self):
+        CountingReference.format_count += 1
+        return super().__repr__()
+
+class TestLogging():
+
+    def test_disabled_debug_does_not_format_arguments(self):
+
+        module_logger = logging.getLogger("utility_pack")
+        old_level = module_logger.level
+        module_logger.setLevel(logging.WARNING)
+
+        try:
+            CountingReference.format_count = 0
+            CaseCorrection(["tEste"]).correct(CountingReference(["Teste"]))
+        finally:
+            module_logger.setLevel(old_level)
+
+        assert CountingReference.format_count == 0
+
+    def test_queue_logging_writes_through_listener(self):
+
+        module_logger = logging.getLogger("utility_pack")
+        old_level = module_logger.level
+        stream = io.StringIO()
+
+        listener = setup_logging(logging.WARNING, queue = True, handler = logging.StreamHandler(stream))
+        try:
+            ReferenceIndex(["Teste", "TESTE"])
+        finally:
+            listener.stop()
+            for handler in list(module_logger.handlers):
+                module_logger.removeHandler(handler)
+            module_logger.propagate = True
+            module_logger.setLevel(old_level)
+
+        assert "ambiguous reference labels found" in stream.getvalue()
+
+    def test_default_setup_logging(self):
+
+        module_logger = logging.getLogger("utility_pack")
+        old_level = module_logger.level
+
+        try:
+            assert setup_logging() is None
+            assert module_logger.level == logging.DEBUG
+        finally:
+            module_logger.setLevel(old_level)
+
+    def test_repeated_queue_setup_does_not_stack_handlers(self):
+
+        from logging.handlers import QueueHandler
+
+        module_logger = logging.getLogger("utility_pack")
+        old_level = module_logger.level
+        first_stream = io.StringIO()
+        second_stream = io.StringIO()
+
+        first = setup_logging(logging.WARNING, queue = True, handler = logging.StreamHandler(first_stream))
+        second = setup_logging(logging.WARNING, queue = True, handler = logging.StreamHandler(second_stream))
+        try:
+            queue_handlers = [handler for handler in module_logger.handlers if isinstance(handler, QueueHandler)]
+            ReferenceIndex(["Teste", "TESTE"])
+        finally:
+            second.stop()
+            for handler in list(module_logger.handlers):
+                module_logger.removeHandler(handler)
+            module_logger.propagate = True
+            module_logger.setLevel(old_level)
+
+        assert len(queue_handlers) == 1
+        assert first is not second
+        assert first_stream.getvalue() == ""
+        assert "ambiguous reference labels found" in second_stream.getvalue()
+
+class TestResultPrinter():
+
+    def test_result_printer_reads_caller_variables(self):
+
+        local_value = "visible"
+        printer = ResultPrinter("local_value", ("pair", 1), keyword = "x" * 200)
+
+        text = str(printer)
+        assert "visible" in text
+        assert "pair" in text
+        assert "x" * (ResultPrinter.max_width - 3) + "..." in text
+        assert "x" * ResultPrinter.max_width not in text
+
+    def test_print_rows_streams_table(self):
+
+        out = io.StringIO()
+        written = print_rows(((number, "v" * number) for number in range(5)), ["id", "val"], out = out, chunk_size = 2, max_width = 3)
+
+        assert written == 5
+        assert out.getvalue().splitlines() == ["+----+-----+",
+                                               "| id | val |",
+                                               "+----+-----+",
+                                               "| 0  |     |",
+                                               "| 1  |  v  |",
+                                               "| 2  |  vv |",
+                                               "| 3  | vvv |",
+                                               "| 4  | vvv |",
+                                               "+----+-----+"]
+
+    def test_print_rows_rejects_uneven_rows(self):
+
+        for rows in ([(1, "a"), (2,)], [(1, "a", "extra")]):
+            try:
+                print_rows(rows, ["id", "val"], out = io.StringIO())
+                raise AssertionError("uneven row was printed")
+            except ValueError as error:
+                assert "incorrect number of values" in str(error)
+
+    def test_print_rows_plain(self):
+
+        out = io.StringIO()
+        print_rows([(1, "a\tb"), (2, None)], ["id", "value"], out = out, plain = True)
+
+        assert out.getvalue() == "id\tvalue\n1\ta b\n2\tNone\n"
+
+class TestInstrumentation():
+
+    def test_disabled_instrumentation_records_nothing(self):
+
+        utility_pack.instrumentation.disable()
+        utility_pack.instrumentation.reset()
+        CaseCorrection(["tEste"]).correct(["Teste"])
+
+        assert utility_pack.instrumentation.snapshot()["operations"] == {}
+
+    def test_enabled_instrumentation_records_latency_and_counts(self):
+
+        path = "test_folder/"
+        create_marker(path)
+        instrumentation = utility_pack.instrumentation
+        instrumentation.reset()
+        instrumentation.enable(profile = True)
+
+        try:
+            CaseCorrection(["tEste", "outro"]).correct(["Teste", "Outro"])
+            ManageTestCsvFiles(path, line_number = 4).create_csv()
+            DataFormatting(pd.DataFrame({"a": [1, 2, 3]})).create_data_list()
+            ManageTestFiles(path).clear_folder()
+            snapshot = instrumentation.snapshot()
+            stats = instrumentation.profile_stats()
+        finally:
+            instrumentation.disable()
+            instrumentation.reset()
+
+        operations = snapshot["operations"]
+        assert operations["correct"]["calls"] == 1
+        assert operations["correct"]["counts"] == {"labels": 2, "renamed": 2}
+        assert sum(operations["correct"]["histogram"].values()) == 1
+        assert operations["create_csv"]["counts"]["lines"] == 5
+        assert operations["create"]["counts"]["bytes"] == operations["create_csv"]["counts"]["bytes"] > 0
+        assert operations["create_data_list"]["counts"]["rows"] == 3
+        assert operations["clear_folder"]["counts"]["entries"] == 1
+        assert stats is not None and stats.total_calls > 0
+
+class TestBenchmarks():
+
+    def test_benchmarks_run_and_detect_regressions(self):
+
+        import benchmark_utility_pack
+
+        results = benchmark_utility_pack.run_benchmarks([10], repeat = 1)
+        slower = {key: {"seconds": result["seconds"] * 2 + 1, "peak_bytes": result["peak_bytes"]} for key, result in results.items()}
+
+        assert set(results) == {f"{name}@10" for name in benchmark_utility_pack.BENCHMARKS}
+        assert benchmark_utility_pack.compare(results, results) == []
+        assert len(benchmark_utility_pack.compare(slower, results)) == len(results)
+
 if __name__ == "__main__":
     pass